@@ -0,0 +1,221 @@
+import math
+import threading
+from collections import OrderedDict
+from PIL import Image
+from images_to_pdf import can_decode_rows, decode_box, to_pdf_mode
+
+# Edge length of a tile in pixels of its pyramid level
+TILE_SIZE = 256
+
+# Number of tiles kept in memory. Tiles are cached at the resolution of their
+# level, so this is at most about 100 MB of RGB pixels at any zoom.
+MAX_CACHED_TILES = 512
+
+# Levels up to this many pixels are built as whole images; finer levels are
+# cut tile by tile from the source
+MAX_LEVEL_PIXELS = 16_000_000
+
+# Source rows decoded at once while building levels from a partially decodable image
+BUILD_ROWS = 512
+
+class ImagePyramid:
+    """
+    Lazily built multi-resolution view of an image for zooming and panning.
+
+    Level 0 is the full-resolution image, each further level halves both
+    dimensions. Coarse levels of at most MAX_LEVEL_PIXELS are built as whole
+    images the first time one is needed. Tiles of finer levels are decoded
+    from the source only when requested: uncompressed striped or tiled TIFFs
+    decode just the source tiles under the view, other formats are decoded
+    in full and kept only while a fine level is being viewed. JPEGs are
+    decoded at reduced size for the coarse levels.
+
+    tile() may decode and should run off the GUI thread; cached_tile() only
+    looks up tiles that are already made.
+    """
+
+    def __init__(self, path, tile_size=TILE_SIZE, max_tiles=MAX_CACHED_TILES):
+        self.path = path
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        with Image.open(path) as img:
+            self.size = img.size
+            self.mode = img.mode
+            self.format = img.format
+            self._source_tiles = list(img.tile) if can_decode_rows(img) else None
+        if self.size[0] == 0 or self.size[1] == 0:
+            raise ValueError("Invalid image dimensions (0x0)")
+        self.max_level = max(0, math.ceil(math.log2(max(self.size) / tile_size)))
+
+        # Finest level that is built as a whole image
+        self.whole_level = 0
+        while self.whole_level < self.max_level and self._pixels(self.whole_level) > MAX_LEVEL_PIXELS:
+            self.whole_level += 1
+
+        self._levels = {}
+        self._full = None
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pixels(self, level):
+        width, height = self.level_size(level)
+        return width * height
+
+    def level_for_zoom(self, zoom):
+        """Return the coarsest level that still has at least `zoom` resolution."""
+        if zoom >= 1:
+            return 0
+        return min(self.max_level, int(math.floor(math.log2(1 / zoom))))
+
+    def level_size(self, level):
+        scale = 2 ** level
+        return (max(1, math.ceil(self.size[0] / scale)), max(1, math.ceil(self.size[1] / scale)))
+
+    def level_image(self, level):
+        """Return the whole image of a coarse level (level >= whole_level), building it on first use."""
+        if level in self._levels:
+            return self._levels[level]
+
+        if level > self.whole_level:
+            # Coarser levels are cheap reductions of the finest whole level
+            image = self.level_image(level - 1).reduce(2)
+        elif self.format == 'JPEG':
+            # The JPEG decoder can scale by up to 1/8 while decoding
+            image = self._open(self.level_size(level))
+        elif self._source_tiles is not None:
+            image = self._build_from_bands(level)
+        else:
+            image = self._full_image().reduce(2 ** level) if level else self._full_image()
+
+        if image.size != self.level_size(level):
+            image = image.resize(self.level_size(level), Image.LANCZOS)
+
+        self._levels[level] = image
+        return image
+
+    def _build_from_bands(self, level):
+        """Build a level from bands of source rows, so the source is never held in full."""
+        scale = 2 ** level
+        width, height = self.size
+        image = None
+        # Bands are a multiple of the scale high, so each reduces to whole rows
+        step = max(scale, BUILD_ROWS // scale * scale)
+        for top in range(0, height, step):
+            bottom = min(height, top + step)
+            band = self._prepare(decode_box(self.path, 0, self._source_tiles, (0, top, width, bottom)))
+            if image is None:
+                image = Image.new(band.mode, self.level_size(level))
+            image.paste(band.reduce(scale) if scale > 1 else band, (0, top // scale))
+            band.close()
+        return image
+
+    def _full_image(self):
+        if self._full is None:
+            self._full = self._open(self.size)
+        return self._full
+
+    def _open(self, size):
+        with Image.open(self.path) as img:
+            if size != img.size:
+                img.draft('RGB', size)
+            image = self._prepare(img)
+            if image is img:
+                image = img.copy()
+        return image
+
+    def _prepare(self, image):
+        image = to_pdf_mode(image)
+        if image.mode == '1':
+            image = image.convert('L')
+        return image
+
+    def _source_region(self, level, box):
+        """Return a box of a fine level (level < whole_level), decoded from the source."""
+        scale = 2 ** level
+        width, height = self.size
+        source_box = (box[0] * scale, box[1] * scale, min(width, box[2] * scale), min(height, box[3] * scale))
+        if self._source_tiles is not None:
+            region = self._prepare(decode_box(self.path, 0, self._source_tiles, source_box))
+        else:
+            region = self._full_image().crop(source_box)
+        if scale > 1:
+            region = region.reduce(scale)
+        size = (box[2] - box[0], box[3] - box[1])
+        if region.size != size:
+            region = region.resize(size, Image.LANCZOS)
+        return region
+
+    def tile_count(self, level):
+        width, height = self.level_size(level)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def tile_box(self, level, col, row):
+        """Return the (left, top, right, bottom) box of a tile in level pixels."""
+        width, height = self.level_size(level)
+        left = col * self.tile_size
+        top = row * self.tile_size
+        return (left, top, min(width, left + self.tile_size), min(height, top + self.tile_size))
+
+    def cached_tile(self, level, col, row):
+        """Return a tile if it has already been made, otherwise None. Never decodes."""
+        key = (level, col, row)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def tile(self, level, col, row):
+        """
+        Return one tile of a level at the level's resolution.
+
+        Args:
+            level (int): Pyramid level
+            col (int): Tile column
+            row (int): Tile row
+
+        Returns:
+            PIL.Image.Image: The tile; tile_box() gives its extent in the level
+        """
+        tile = self.cached_tile(level, col, row)
+        if tile is not None:
+            return tile
+
+        box = self.tile_box(level, col, row)
+        if level >= self.whole_level:
+            tile = self.level_image(level).crop(box)
+            # Nothing needs full resolution while coarse levels are viewed
+            self._full = None
+        else:
+            tile = self._source_region(level, box)
+
+        key = (level, col, row)
+        with self._lock:
+            self._tiles[key] = tile
+            if len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def close(self):
+        self._levels.clear()
+        self._full = None
+        with self._lock:
+            self._tiles.clear()
+
+
+def scale_tile(tile, size):
+    """
+    Resample a tile to its size on screen.
+
+    Args:
+        tile (PIL.Image.Image): Tile from ImagePyramid.tile()
+        size (tuple): (width, height) to resample the tile to
+
+    Returns:
+        PIL.Image.Image: The resampled tile, or tile itself if it already has that size
+    """
+    if tile.size == size:
+        return tile
+    # Enlarge with nearest neighbour so individual pixels can be inspected
+    resample = Image.NEAREST if size[0] > tile.size[0] else Image.BILINEAR
+    return tile.resize(size, resample)
@@ -0,0 +1,431 @@
+import io
+import os
+import re
+import time
+import zlib
+from PIL import Image, ImageSequence, PdfParser
+
+# Scans routinely exceed Pillow's decompression-bomb guard, so lift it for
+# the images this tool is explicitly asked to convert.
+Image.MAX_IMAGE_PIXELS = None
+
+# File extensions picked up when importing folders
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.gif')
+
+# Modes the PDF writer embeds as-is; anything else is converted to RGB
+PDF_MODES = ('1', 'L', 'RGB')
+
+# Frames at or above this size take the strip-based path and are written alone
+LARGE_IMAGE_PIXELS = 64_000_000
+
+# Height of the strips a large frame is converted in
+STRIP_HEIGHT = 512
+
+# EXIF orientation tag
+ORIENTATION_TAG = 0x0112
+
+# Upper bound on decoded pixels held before pages are flushed to the PDF
+PDF_BATCH_PIXELS = 32_000_000
+
+
+def natural_sort_key(path):
+    """
+    Sort key that orders embedded numbers by value ("page2" before "page10").
+
+    Args:
+        path (str): File path or name
+
+    Returns:
+        list: Key comparing text case-insensitively and digit runs numerically
+    """
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part.lower())
+            for part in re.split(r'(\d+)', str(path))]
+
+def find_images(folder, recursive=True):
+    """
+    List the image files in a folder in natural sort order.
+
+    Only directory entries are read, not the files themselves.
+
+    Args:
+        folder (str): Folder to search
+        recursive (bool, optional): Include subfolders. Defaults to True.
+
+    Returns:
+        list: Paths of the image files
+    """
+    found = []
+    pending = [folder]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        found.append(entry.path)
+        except OSError:
+            # Unreadable subfolders are skipped rather than aborting the import
+            continue
+    return sorted(found, key=natural_sort_key)
+
+def read_image_header(path):
+    """
+    Read an image's metadata without decoding its pixels.
+
+    Args:
+        path (str): Path to the image
+
+    Returns:
+        dict: width, height, mode, frames and size in bytes; 'error' holds a
+        message for files that cannot be opened, otherwise None
+    """
+    info = {'width': 0, 'height': 0, 'mode': None, 'frames': 0, 'size': 0, 'error': None}
+    try:
+        info['size'] = os.path.getsize(path)
+        with Image.open(path) as img:
+            info['width'], info['height'] = img.size
+            info['mode'] = img.mode
+            info['frames'] = getattr(img, 'n_frames', 1)
+    except Exception as e:
+        info['error'] = str(e) or type(e).__name__
+    return info
+
+def to_pdf_mode(img):
+    """
+    Return an image in a mode the PDF writer can embed.
+
+    Transparent images are flattened onto a white background. Images already
+    in a PDF-compatible mode are returned unchanged (not copied).
+
+    Args:
+        img (PIL.Image.Image): Source image or frame
+
+    Returns:
+        PIL.Image.Image: Image in one of PDF_MODES
+    """
+    if img.mode in PDF_MODES:
+        return img
+
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        rgba = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+
+    return img.convert('RGB')
+
+
+def can_decode_rows(img):
+    """
+    Check whether a frame's rows can be decoded a band at a time.
+
+    This holds for formats Pillow stores as several independent tiles, such
+    as uncompressed striped or tiled TIFFs. Compressed TIFFs, PNGs and JPEGs
+    are a single tile and have to be decoded in full.
+
+    Args:
+        img (PIL.Image.Image): Opened, not yet loaded image or frame
+
+    Returns:
+        bool: True if decode_region() can read part of the frame
+    """
+    if len(img.tile) < 2 or not getattr(img, 'filename', None):
+        return False
+    if getattr(img, 'use_load_libtiff', False):
+        return False
+    # Pillow rotates oriented images on load, which would rotate each band instead
+    return img.getexif().get(ORIENTATION_TAG, 1) == 1
+
+def row_bands(img, strip_height=STRIP_HEIGHT):
+    """
+    Split a frame into horizontal bands of about strip_height rows.
+
+    When the frame can be decoded partially, band edges follow the frame's
+    tile boundaries so no tile is decoded twice.
+
+    Args:
+        img (PIL.Image.Image): Opened, not yet loaded image or frame
+        strip_height (int, optional): Rows per band. Defaults to STRIP_HEIGHT.
+
+    Returns:
+        list: (top, bottom, tiles) tuples; tiles is None for frames that
+        cannot be decoded partially
+    """
+    width, height = img.size
+    if not can_decode_rows(img):
+        return [(top, min(height, top + strip_height), None) for top in range(0, height, strip_height)]
+
+    bands = []
+    # tile[1] holds a tile's (left, top, right, bottom) extents on every Pillow version
+    remaining = sorted(img.tile, key=lambda tile: tile[1][1])
+    while remaining:
+        top = remaining[0][1][1]
+        bottom = top + strip_height
+        # Grow the band until no tile straddles its lower edge
+        while True:
+            inside = [tile for tile in remaining if tile[1][1] < bottom]
+            lowest = max(tile[1][3] for tile in inside)
+            if lowest <= bottom:
+                bottom = lowest
+                break
+            bottom = lowest
+        bands.append((top, bottom, inside))
+        remaining = [tile for tile in remaining if tile[1][1] >= bottom]
+    return bands
+
+def _shift_tile(tile, left, top):
+    """Move a tile's extents by (-left, -top), keeping the tile's own tuple type."""
+    codec, (x0, y0, x1, y1), *rest = tile
+    shifted = (codec, (x0 - left, y0 - top, x1 - left, y1 - top), *rest)
+    # Pillow 11+ uses the _Tile named tuple, older versions plain tuples
+    return shifted if type(tile) is tuple else type(tile)(*shifted)
+
+def decode_region(path, frame, box, tiles):
+    """
+    Decode only part of an image by narrowing its tile list.
+
+    Args:
+        path (str): Path to the image
+        frame (int): Frame index within the image
+        box (tuple): (left, top, right, bottom) region, covering all of tiles
+        tiles (list): The image's tiles that overlap the region
+
+    Returns:
+        PIL.Image.Image: The decoded region
+    """
+    left, top, right, bottom = box
+    with Image.open(path) as region:
+        region.seek(frame)
+        region.tile = [_shift_tile(tile, left, top) for tile in tiles]
+        region._size = (right - left, bottom - top)
+        if hasattr(region, '_tile_size'):
+            # TIFF allocates the decode buffer from its own copy of the size
+            region._tile_size = region._size
+        region.load()
+        return region.copy()
+
+def decode_box(path, frame, tiles, box):
+    """
+    Decode a region of an image from the tiles that overlap it.
+
+    Args:
+        path (str): Path to the image
+        frame (int): Frame index within the image
+        tiles (list): All tiles of the frame, see can_decode_rows()
+        box (tuple): (left, top, right, bottom) region to decode
+
+    Returns:
+        PIL.Image.Image: The region, cropped to box
+    """
+    left, top, right, bottom = box
+    inside = [tile for tile in tiles
+              if tile[1][0] < right and tile[1][2] > left and tile[1][1] < bottom and tile[1][3] > top]
+    extents = [tile[1] for tile in inside]
+    covered = (
+        min(e[0] for e in extents), min(e[1] for e in extents),
+        max(e[2] for e in extents), max(e[3] for e in extents)
+    )
+    region = decode_region(path, frame, covered, inside)
+    if covered == box:
+        return region
+    cropped = region.crop((left - covered[0], top - covered[1], right - covered[0], bottom - covered[1]))
+    region.close()
+    return cropped
+
+def _write_strip(pdf, ref, strip):
+    """Write one strip as an image XObject and return its PDF procset name."""
+    if strip.mode == '1':
+        # Packed rows with 1 = white match DeviceGray at one bit per component
+        pdf.write_obj(
+            ref, stream=zlib.compress(strip.tobytes()),
+            Type=PdfParser.PdfName('XObject'), Subtype=PdfParser.PdfName('Image'),
+            Width=strip.width, Height=strip.height, Filter=PdfParser.PdfName('FlateDecode'),
+            BitsPerComponent=1, ColorSpace=PdfParser.PdfName('DeviceGray')
+        )
+        return 'ImageB'
+
+    # Same JPEG encoding Pillow's PDF writer uses for whole pages
+    buffer = io.BytesIO()
+    strip.save(buffer, 'JPEG')
+    pdf.write_obj(
+        ref, stream=buffer.getvalue(),
+        Type=PdfParser.PdfName('XObject'), Subtype=PdfParser.PdfName('Image'),
+        Width=strip.width, Height=strip.height, Filter=PdfParser.PdfName('DCTDecode'),
+        BitsPerComponent=8, ColorSpace=PdfParser.PdfName('DeviceRGB' if strip.mode == 'RGB' else 'DeviceGray')
+    )
+    return 'ImageC' if strip.mode == 'RGB' else 'ImageB'
+
+
+class PDFPageWriter:
+    """
+    Incrementally write pages into a PDF file.
+
+    Pages are buffered until PDF_BATCH_PIXELS is reached and then appended to
+    the output file, so memory use does not grow with the number of pages.
+    """
+
+    def __init__(self, output_path, resolution=100.0, batch_pixels=PDF_BATCH_PIXELS):
+        self.output_path = str(output_path)
+        self.resolution = resolution
+        self.batch_pixels = batch_pixels
+        self.page_count = 0
+        self._batch = []
+        self._batch_size = 0
+        self._started = False
+
+    def add(self, frame):
+        """Add one frame as a page. The frame may be reused by the caller afterwards."""
+        width, height = frame.size
+        if width * height >= LARGE_IMAGE_PIXELS:
+            # Write huge frames on their own, as a stack of strips on one page
+            self.flush()
+            self._write_strips(frame)
+            return
+
+        page = to_pdf_mode(frame)
+        if page is frame:
+            # Multi-frame sources reuse the same object for every frame
+            page = frame.copy()
+        self._batch.append(page)
+        self._batch_size += width * height
+        if self._batch_size >= self.batch_pixels:
+            self.flush()
+
+    def flush(self):
+        """Append any buffered pages to the output file."""
+        if not self._batch:
+            return
+        try:
+            self._write(self._batch)
+        finally:
+            for page in self._batch:
+                page.close()
+            self._batch = []
+            self._batch_size = 0
+
+    def close(self):
+        self.flush()
+
+    def _write(self, pages):
+        options = {'resolution': self.resolution, 'append': self._started}
+        if len(pages) > 1:
+            # Only detached single-frame copies are batched, so save_all
+            # writes exactly these pages
+            options.update(save_all=True, append_images=pages[1:])
+        pages[0].save(self.output_path, 'PDF', **options)
+        self._started = True
+        self.page_count += len(pages)
+
+    def _write_strips(self, frame):
+        """
+        Append a frame as one page made of strip images.
+
+        Each strip is decoded, converted and encoded on its own, so only one
+        strip of page data is held at a time. Frames that cannot be decoded
+        partially (see can_decode_rows()) are decoded once in full and cut
+        into strips from there.
+        """
+        width, height = frame.size
+        bands = row_bands(frame)
+        if bands[0][2] is None:
+            frame.load()
+
+        scale = 72.0 / self.resolution
+        # A page that fails partway is cut off again, so the file stays a valid PDF
+        length = os.path.getsize(self.output_path) if self._started else 0
+        pdf = PdfParser.PdfParser(filename=self.output_path, mode='r+b' if self._started else 'w+b')
+        try:
+            if not self._started:
+                pdf.info['Title'] = os.path.splitext(os.path.basename(self.output_path))[0]
+                pdf.info['CreationDate'] = pdf.info['ModDate'] = time.gmtime()
+            pdf.start_writing()
+            pdf.write_header()
+
+            strip_refs = [pdf.next_object_id(0) for _ in bands]
+            page_ref = pdf.next_object_id(0)
+            contents_ref = pdf.next_object_id(0)
+            pdf.pages.append(page_ref)
+            pdf.write_catalog()
+
+            contents = []
+            procsets = set()
+            for index, ((top, bottom, tiles), ref) in enumerate(zip(bands, strip_refs)):
+                if tiles is None:
+                    band = frame.crop((0, top, width, bottom))
+                else:
+                    band = decode_region(frame.filename, frame.tell(), (0, top, width, bottom), tiles)
+                strip = to_pdf_mode(band)
+                procsets.add(_write_strip(pdf, ref, strip))
+                strip.close()
+                band.close()
+                # PDF y runs upwards from the bottom of the page
+                contents.append(b"q %f 0 0 %f 0 %f cm /S%d Do Q\n" % (
+                    width * scale, (bottom - top) * scale, (height - bottom) * scale, index
+                ))
+
+            pdf.write_page(
+                page_ref,
+                Resources=PdfParser.PdfDict(
+                    ProcSet=[PdfParser.PdfName('PDF')] + [PdfParser.PdfName(p) for p in sorted(procsets)],
+                    XObject=PdfParser.PdfDict({f"S{i}": ref for i, ref in enumerate(strip_refs)})
+                ),
+                MediaBox=[0, 0, width * scale, height * scale],
+                Contents=contents_ref
+            )
+            pdf.write_obj(contents_ref, stream=b"".join(contents))
+            pdf.write_xref_and_trailer()
+        except BaseException:
+            pdf.f.truncate(length)
+            raise
+        finally:
+            pdf.close()
+        self._started = True
+        self.page_count += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def convert_images_to_pdf(image_paths, output_path, resolution=100.0, on_progress=None, on_error=None):
+    """
+    Combine images into a single PDF, one page per frame.
+
+    Every frame of multi-frame inputs (TIFF, GIF, ...) becomes its own page.
+    Frames are decoded one at a time and streamed into the output file;
+    frames of LARGE_IMAGE_PIXELS or more are written strip by strip.
+
+    Args:
+        image_paths (list): Paths to the input images, in page order
+        output_path (str): Path of the PDF to create
+        resolution (float, optional): PDF resolution in DPI. Defaults to 100.0.
+        on_progress (callable, optional): Called as on_progress(index, total) after each input
+        on_error (callable, optional): Called as on_error(path, exception) for unreadable inputs.
+            If not given, the exception is raised.
+
+    Returns:
+        int: Number of pages written
+    """
+    total = len(image_paths)
+    with PDFPageWriter(output_path, resolution) as writer:
+        for index, image_path in enumerate(image_paths, 1):
+            try:
+                with Image.open(image_path) as img:
+                    for frame in ImageSequence.Iterator(img):
+                        writer.add(frame)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(image_path, e)
+            if on_progress is not None:
+                on_progress(index, total)
+
+    return writer.page_count
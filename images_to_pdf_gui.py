@@ -3,9 +3,19 @@ import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import threading
+import queue
 from typing import List, Tuple
+from images_to_pdf import convert_images_to_pdf, find_images, read_image_header
+from image_pyramid import ImagePyramid, scale_tile
+from planner import format_plan, plan_images
+
+# Zoom factor per wheel notch or +/- click
+ZOOM_STEP = 1.25
+
+# Largest preview zoom (800%)
+MAX_ZOOM = 8.0
 
 class ImagesToPDFConverterApp:
     def __init__(self, root):
@@ -21,6 +31,31 @@ class ImagesToPDFConverterApp:
         self.conversion_in_progress = False
         self.current_preview_index = -1
         
+        # Header metadata per path, filled in by the background scanner
+        self.image_info = {}
+        self.scan_results = queue.Queue()
+        self.scan_in_progress = False
+        self.scan_total = 0
+        self.scan_unreadable = 0
+        
+        # Zoomable preview state; preview_zoom is None while fitting the window
+        self.pyramid = None
+        self.preview_zoom = None
+        self.current_zoom = 1.0
+        self.fit_zoom = 1.0
+        self.preview_origin = (0, 0)
+        self.preview_photos = {}
+        self.pan_start = None
+        self.zoom_text = tk.StringVar(value="")
+        
+        # Tiles are decoded on a background thread, newest requests first.
+        # Entries are (pyramid, (level, col, row)). The tile thread only reads
+        # wanted_tiles, which the Tk thread replaces as a whole.
+        self.tile_requests = queue.LifoQueue()
+        self.requested_tiles = set()
+        self.wanted_tiles = set()
+        self.tile_render_pending = False
+        
         # Drag and drop variables
         self.drag_start_index = None
         self.drag_current_index = None
@@ -29,6 +64,10 @@ class ImagesToPDFConverterApp:
         self.drag_rect = None
         
         self.setup_ui()
+        
+        tile_thread = threading.Thread(target=self.load_tiles)
+        tile_thread.daemon = True
+        tile_thread.start()
     
     def setup_ui(self):
         # Main frame
@@ -41,6 +80,7 @@ class ImagesToPDFConverterApp:
         
         # Buttons
         ttk.Button(button_frame, text="Add Images", command=self.add_images).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="Add Folder", command=self.add_folder).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Remove Selected", command=self.remove_selected).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Remove All", command=self.remove_all).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Move Up", command=lambda: self.move_item(-1)).pack(side=tk.LEFT, padx=5)
@@ -77,10 +117,28 @@ class ImagesToPDFConverterApp:
         # Bind window resize event to update preview
         self.root.bind('<Configure>', lambda e: self.on_window_configure())
         
+        # Zoom controls
+        zoom_frame = ttk.Frame(preview_frame)
+        zoom_frame.pack(fill=tk.X, padx=5)
+        ttk.Button(zoom_frame, text="Fit", width=5, command=self.fit_preview).pack(side=tk.LEFT)
+        ttk.Button(zoom_frame, text="100%", width=5, command=lambda: self.set_preview_zoom(1.0)).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(zoom_frame, text="\u2212", width=3, command=lambda: self.zoom_preview(1 / ZOOM_STEP)).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(zoom_frame, text="+", width=3, command=lambda: self.zoom_preview(ZOOM_STEP)).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(zoom_frame, textvariable=self.zoom_text).pack(side=tk.LEFT, padx=(10, 0))
+        
         # Preview area
         self.preview_canvas = tk.Canvas(preview_frame, bg='white', highlightthickness=0)
         self.preview_canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Wheel zooms around the cursor, dragging pans, double-click toggles fit/100%
+        self.preview_canvas.bind('<MouseWheel>', self.on_preview_wheel)
+        self.preview_canvas.bind('<Button-4>', self.on_preview_wheel)
+        self.preview_canvas.bind('<Button-5>', self.on_preview_wheel)
+        self.preview_canvas.bind('<ButtonPress-1>', self.on_preview_press)
+        self.preview_canvas.bind('<B1-Motion>', self.on_preview_drag)
+        self.preview_canvas.bind('<ButtonRelease-1>', lambda e: setattr(self, 'pan_start', None))
+        self.preview_canvas.bind('<Double-Button-1>', self.on_preview_double_click)
+        
         # Add a label for preview instructions
         self.preview_label = ttk.Label(
             self.preview_canvas,
@@ -119,6 +177,8 @@ class ImagesToPDFConverterApp:
         ttk.Label(bottom_frame, textvariable=self.status, relief=tk.SUNKEN, anchor=tk.W).pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.convert_btn = ttk.Button(bottom_frame, text="Convert to PDF", command=self.start_conversion)
         self.convert_btn.pack(side=tk.RIGHT, padx=(5, 0))
+        self.plan_btn = ttk.Button(bottom_frame, text="Plan...", command=self.start_plan)
+        self.plan_btn.pack(side=tk.RIGHT, padx=(5, 0))
         
         # Set initial output filename
         self.update_output_filename()
@@ -138,13 +198,108 @@ class ImagesToPDFConverterApp:
         )
         
         if files:
-            for file_path in files:
-                if file_path not in self.image_paths:
-                    self.image_paths.append(file_path)
-                    self.listbox.insert(tk.END, os.path.basename(file_path))
+            self.start_scan(paths=list(files))
+    
+    def add_folder(self):
+        if self.conversion_in_progress or self.scan_in_progress:
+            return
+        
+        folder = filedialog.askdirectory(title="Select Folder (subfolders are included)")
+        if folder:
+            self.start_scan(folder=folder)
+    
+    def start_scan(self, paths=None, folder=None):
+        """Read image headers on a background thread and add the images as they are scanned."""
+        if self.scan_in_progress:
+            self.update_status("Still scanning, please wait")
+            return
+        
+        self.scan_in_progress = True
+        self.scan_total = len(paths) if paths else 0
+        self.scan_unreadable = 0
+        self.update_status("Scanning folder..." if folder else f"Scanning {self.scan_total} image(s)...")
+        
+        thread = threading.Thread(target=self.scan_images, args=(paths, folder))
+        thread.daemon = True
+        thread.start()
+        self.process_scan_results()
+    
+    def scan_images(self, paths, folder, batch_size=200):
+        # Runs on the scan thread: no Tk calls, results go through self.scan_results
+        try:
+            if folder:
+                paths = find_images(folder)
+                self.scan_results.put(('found', len(paths)))
             
+            batch = []
+            for path in paths:
+                batch.append((path, read_image_header(path)))
+                if len(batch) >= batch_size:
+                    self.scan_results.put(('batch', batch))
+                    batch = []
+            if batch:
+                self.scan_results.put(('batch', batch))
+        except Exception as e:
+            self.scan_results.put(('error', str(e)))
+        finally:
+            self.scan_results.put(('done', None))
+    
+    def process_scan_results(self):
+        finished = False
+        try:
+            # Bound the work per tick so the UI stays responsive during big imports
+            for _ in range(20):
+                kind, value = self.scan_results.get_nowait()
+                if kind == 'found':
+                    self.scan_total = value
+                elif kind == 'batch':
+                    self.add_scanned_images(value)
+                elif kind == 'error':
+                    messagebox.showerror("Error", f"Failed to scan folder: {value}")
+                elif kind == 'done':
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+        
+        suffix = f", {self.scan_unreadable} unreadable" if self.scan_unreadable else ""
+        if finished:
+            self.scan_in_progress = False
+            self.update_output_filename()
+            self.update_status(f"{len(self.image_paths)} image(s) in list{suffix}")
+        else:
+            self.update_status(f"Scanning... {len(self.image_paths)} image(s) in list, {self.scan_total} found{suffix}")
+            self.root.after(50, self.process_scan_results)
+    
+    def add_scanned_images(self, scanned):
+        was_empty = not self.image_paths
+        for path, info in scanned:
+            # image_info holds exactly the listed paths, so it doubles as a fast duplicate check
+            if path in self.image_info:
+                continue
+            self.image_info[path] = info
+            self.image_paths.append(path)
+            self.listbox.insert(tk.END, self.item_label(path))
+            self.style_item(len(self.image_paths) - 1)
+            if info['error']:
+                self.scan_unreadable += 1
+        
+        if was_empty and self.image_paths:
             self.update_output_filename()
-            self.update_status(f"Added {len(files)} image(s)")
+    
+    def item_label(self, path: str) -> str:
+        info = self.image_info.get(path)
+        name = os.path.basename(path)
+        if info and info['error']:
+            return f"\u26a0 {name} (unreadable)"
+        if info and info['frames'] > 1:
+            return f"{name} ({info['frames']} pages)"
+        return name
+    
+    def style_item(self, index: int):
+        info = self.image_info.get(self.image_paths[index])
+        if info and info['error']:
+            self.listbox.itemconfig(index, foreground='red')
     
     def remove_selected(self):
         if self.conversion_in_progress or not self.listbox.curselection():
@@ -155,7 +310,7 @@ class ImagesToPDFConverterApp:
         
         for index in selected:
             self.listbox.delete(index)
-            self.image_paths.pop(index)
+            self.image_info.pop(self.image_paths.pop(index), None)
         
         self.update_output_filename()
         self.update_status(f"Removed {len(selected)} image(s)")
@@ -173,6 +328,7 @@ class ImagesToPDFConverterApp:
         ):
             self.listbox.delete(0, tk.END)
             self.image_paths.clear()
+            self.image_info.clear()
             self.update_output_filename()
             self.update_status("Removed all images")
             self.preview_label.config(text="No image selected")
@@ -203,6 +359,8 @@ class ImagesToPDFConverterApp:
         self.listbox.insert(index, item2)
         self.listbox.delete(new_index, new_index)
         self.listbox.insert(new_index, item1)
+        self.style_item(index)
+        self.style_item(new_index)
         
         # Update selection
         self.listbox.selection_clear(0, tk.END)
@@ -250,15 +408,11 @@ class ImagesToPDFConverterApp:
                 # Move the item in the list
                 self.image_paths.insert(current_index, self.image_paths.pop(self.drag_start_index))
                 
-                # Update the listbox
-                items = list(self.listbox.get(0, tk.END))
-                item_text = items.pop(self.drag_start_index)
-                items.insert(current_index, item_text)
-                
-                # Update the listbox
-                self.listbox.delete(0, tk.END)
-                for item in items:
-                    self.listbox.insert(tk.END, item)
+                # Move only the dragged row; rebuilding the listbox is too slow for long lists
+                item_text = self.listbox.get(self.drag_start_index)
+                self.listbox.delete(self.drag_start_index)
+                self.listbox.insert(current_index, item_text)
+                self.style_item(current_index)
                 
                 # Update the drag start index
                 self.drag_start_index = current_index
@@ -341,10 +495,6 @@ class ImagesToPDFConverterApp:
             self.listbox.activate(index)
     
     def show_preview(self):
-        print("\n--- Starting show_preview ---")  # Debug
-        print(f"Current preview index: {self.current_preview_index}")
-        print(f"Number of images: {len(self.image_paths)}")
-        
         # Clear previous preview if any
         if hasattr(self, 'preview_canvas'):
             self.preview_canvas.delete("all")
@@ -352,126 +502,240 @@ class ImagesToPDFConverterApp:
         
         # Check if we have a valid selection
         if not (0 <= self.current_preview_index < len(self.image_paths)):
-            print("No valid image selected")
+            self.close_preview()
             if hasattr(self, 'preview_label'):
                 self.preview_label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
             return
         
         try:
             image_path = self.image_paths[self.current_preview_index]
-            print(f"Loading image: {image_path}")
-            
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image file not found: {image_path}")
             
-            # Open and convert the image with better quality settings
-            with Image.open(image_path) as img:
-                print(f"Original image size: {img.size}")
+            if self.pyramid is None or self.pyramid.path != image_path:
+                if not os.path.exists(image_path):
+                    raise FileNotFoundError(f"Image file not found: {image_path}")
                 
-                # Convert to RGB if needed (for PNG with transparency)
-                if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[-1])
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Get canvas dimensions with a safety check
-                if not hasattr(self, 'preview_canvas'):
-                    print("Preview canvas not initialized yet")
-                    return
-                    
-                # Get available space with padding
-                padding = 40
-                canvas_width = max(10, self.preview_canvas.winfo_width() - padding * 2)
-                canvas_height = max(10, self.preview_canvas.winfo_height() - padding * 2)
-                
-                print(f"Available canvas size: {canvas_width}x{canvas_height}")
-                
-                # Calculate new size maintaining aspect ratio with high quality
-                width, height = img.size
-                if width == 0 or height == 0:
-                    raise ValueError("Invalid image dimensions (0x0)")
-                
-                # Calculate the maximum size that fits in the canvas while maintaining aspect ratio
-                # Use a higher quality scaling factor for the initial resize
-                scale_factor = min(canvas_width / width, canvas_height / height, 1.0)
-                
-                # For better quality, we'll do a two-pass resize for large downscaling
-                if scale_factor < 0.5:  # If scaling down significantly
-                    # First pass: resize to 2x target size for better quality
-                    temp_size = (int(width * scale_factor * 2), int(height * scale_factor * 2))
-                    if all(dim > 0 for dim in temp_size):
-                        img = img.resize(temp_size, Image.LANCZOS)
-                
-                # Final resize to target size
-                new_size = (max(1, int(width * scale_factor)), max(1, int(height * scale_factor)))
-                print(f"Resizing to: {new_size} (original: {width}x{height})")
-                
-                # Apply high-quality resizing
-                img = img.resize(new_size, Image.LANCZOS)
-                
-                # Apply a slight sharpening to enhance details
-                # img = img.filter(ImageFilter.UnsharpMask(radius=0.5, percent=50, threshold=3))
-                
-                # Convert to PhotoImage with better quality settings
-                photo = ImageTk.PhotoImage(
-                    image=img,
-                    master=self.preview_canvas
-                )
-                print("Image converted to PhotoImage")
-                
-                # Calculate position to center the image with padding
-                x = (self.preview_canvas.winfo_width() - new_size[0]) // 2
-                y = (self.preview_canvas.winfo_height() - new_size[1]) // 2
-                
-                # Ensure position is within canvas bounds
-                x = max(padding // 2, min(x, self.preview_canvas.winfo_width() - new_size[0] - padding // 2))
-                y = max(padding // 2, min(y, self.preview_canvas.winfo_height() - new_size[1] - padding // 2))
-                
-                print(f"Placing image at: ({x}, {y})")
-                
-                # Clear previous image and draw new one with a subtle shadow
-                self.preview_canvas.delete("all")
-                
-                # Add a subtle background for transparent images
-                bg_color = '#f0f0f0' if self.preview_canvas['bg'] == 'white' else '#404040'
-                self.preview_canvas.create_rectangle(
-                    x-1, y-1, 
-                    x + new_size[0] + 1, 
-                    y + new_size[1] + 1,
-                    fill=bg_color, outline=bg_color
-                )
-                
-                # Draw the image
-                img_id = self.preview_canvas.create_image(x, y, anchor=tk.NW, image=photo)
-                
-                # Keep a reference to the image to prevent garbage collection
-                self.preview_canvas.photo = photo
-                
-                # Draw a subtle border
-                self.preview_canvas.create_rectangle(
-                    x, y, 
-                    x + new_size[0] - 1, 
-                    y + new_size[1] - 1,
-                    outline='#cccccc', width=1
-                )
-                
-                # Update status with more info
-                file_size = os.path.getsize(image_path) / 1024  # Size in KB
-                status_text = f"Preview: {os.path.basename(image_path)} ({width}×{height}, {file_size:.1f} KB)"
-                print(status_text)
-                self.update_status(status_text)
+                # Only the header is read here; pixels are decoded on the tile thread
+                self.close_preview()
+                self.pyramid = ImagePyramid(image_path)
+            
+            self.render_preview()
+            
+            # Update status with more info
+            width, height = self.pyramid.size
+            file_size = os.path.getsize(image_path) / 1024  # Size in KB
+            status_text = f"Preview: {os.path.basename(image_path)} ({width}×{height}, {file_size:.1f} KB)"
+            self.update_status(status_text)
                 
         except Exception as e:
             error_msg = f"Error loading preview: {str(e)}"
             print(error_msg)
             import traceback
             traceback.print_exc()
+            self.close_preview()
             if hasattr(self, 'preview_label'):
                 self.preview_label.config(text=error_msg)
                 self.preview_label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
     
+    def close_preview(self):
+        # Drop queued requests so they do not keep the old pyramid alive
+        try:
+            while True:
+                self.tile_requests.get_nowait()
+        except queue.Empty:
+            pass
+        self.requested_tiles = set()
+        self.wanted_tiles = set()
+        
+        if self.pyramid is not None:
+            self.pyramid.close()
+        self.pyramid = None
+        self.preview_zoom = None
+        self.preview_photos = {}
+        self.zoom_text.set("")
+    
+    def load_tiles(self):
+        # Runs on the tile thread: no Tk calls, results are posted back with after()
+        while True:
+            pyramid, key = self.tile_requests.get()
+            if pyramid is not self.pyramid or (pyramid, key) not in self.wanted_tiles:
+                # Panned or zoomed out of view, or another image was selected meanwhile
+                self.root.after(0, lambda p=pyramid, k=key: self.on_tile_skipped(p, k))
+                continue
+            try:
+                pyramid.tile(*key)
+            except Exception as e:
+                self.root.after(0, lambda p=pyramid, k=key, e=e: self.on_tile_error(p, k, str(e)))
+                continue
+            self.root.after(0, lambda p=pyramid, k=key: self.on_tile_ready(p, k))
+    
+    def request_tile(self, key):
+        request = (self.pyramid, key)
+        if request not in self.requested_tiles:
+            self.requested_tiles.add(request)
+            self.tile_requests.put(request)
+    
+    def on_tile_ready(self, pyramid, key):
+        self.requested_tiles.discard((pyramid, key))
+        if pyramid is not self.pyramid or self.tile_render_pending:
+            return
+        # Tiles tend to arrive in bursts; redraw once for all of them
+        self.tile_render_pending = True
+        self.root.after(20, self.render_ready_tiles)
+    
+    def on_tile_skipped(self, pyramid, key):
+        self.requested_tiles.discard((pyramid, key))
+        if pyramid is self.pyramid and (pyramid, key) in self.wanted_tiles:
+            # Came back into view after the tile thread passed over it
+            self.request_tile(key)
+    
+    def render_ready_tiles(self):
+        self.tile_render_pending = False
+        if self.pyramid is not None:
+            self.render_preview()
+    
+    def on_tile_error(self, pyramid, key, message):
+        self.requested_tiles.discard((pyramid, key))
+        if pyramid is self.pyramid:
+            error_msg = f"Error loading preview: {message}"
+            print(error_msg)
+            self.update_status(error_msg)
+    
+    def render_preview(self):
+        """Draw the tiles of the current pyramid that intersect the canvas."""
+        canvas = self.preview_canvas
+        canvas_width = max(10, canvas.winfo_width())
+        canvas_height = max(10, canvas.winfo_height())
+        width, height = self.pyramid.size
+        
+        # Get available space with padding
+        padding = 40
+        self.fit_zoom = min(
+            max(10, canvas_width - padding * 2) / width,
+            max(10, canvas_height - padding * 2) / height,
+            1.0
+        )
+        if self.preview_zoom is None:
+            zoom = self.fit_zoom
+            self.preview_origin = (
+                int((canvas_width - width * zoom) // 2),
+                int((canvas_height - height * zoom) // 2)
+            )
+        else:
+            zoom = self.preview_zoom
+        self.current_zoom = zoom
+        
+        # Tiles come from the coarsest level with enough resolution and are resampled by at most 2x
+        level = self.pyramid.level_for_zoom(zoom)
+        scale = zoom * 2 ** level
+        origin_x, origin_y = self.preview_origin
+        tile_span = self.pyramid.tile_size * scale
+        cols, rows = self.pyramid.tile_count(level)
+        first_col = max(0, int(-origin_x // tile_span))
+        last_col = min(cols - 1, int((canvas_width - origin_x) // tile_span))
+        first_row = max(0, int(-origin_y // tile_span))
+        last_row = min(rows - 1, int((canvas_height - origin_y) // tile_span))
+        
+        canvas.delete("all")
+        
+        # Add a subtle background for transparent images
+        right = origin_x + round(width * zoom)
+        bottom = origin_y + round(height * zoom)
+        bg_color = '#f0f0f0' if canvas['bg'] == 'white' else '#404040'
+        canvas.create_rectangle(origin_x - 1, origin_y - 1, right + 1, bottom + 1, fill=bg_color, outline=bg_color)
+        
+        photos = {}
+        wanted = set()
+        missing = []
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                left, top, tile_right, tile_bottom = self.pyramid.tile_box(level, col, row)
+                x0 = origin_x + round(left * scale)
+                y0 = origin_y + round(top * scale)
+                size = (
+                    max(1, origin_x + round(tile_right * scale) - x0),
+                    max(1, origin_y + round(tile_bottom * scale) - y0)
+                )
+                tile_key = (level, col, row)
+                key = (level, col, row, size)
+                wanted.add((self.pyramid, tile_key))
+                photo = self.preview_photos.get(key)
+                if photo is None:
+                    tile = self.pyramid.cached_tile(*tile_key)
+                    if tile is None:
+                        missing.append(tile_key)
+                        continue
+                    # Only visible tiles are held at screen size, as photos
+                    photo = ImageTk.PhotoImage(image=scale_tile(tile, size), master=canvas)
+                photos[key] = photo
+                canvas.create_image(x0, y0, anchor=tk.NW, image=photo)
+        
+        # Keep references to the visible tiles to prevent garbage collection
+        self.preview_photos = photos
+        
+        # Publish what is visible before requesting, so the tile thread does not skip the requests
+        self.wanted_tiles = wanted
+        for key in missing:
+            self.request_tile(key)
+        self.zoom_text.set(f"{zoom * 100:.0f}%" + (" (loading...)" if missing else ""))
+        
+        # Draw a subtle border
+        canvas.create_rectangle(origin_x, origin_y, right - 1, bottom - 1, outline='#cccccc', width=1)
+    
+    def zoom_preview(self, factor, x=None, y=None):
+        """Zoom by factor, keeping the image point under (x, y) in place (canvas centre by default)."""
+        if self.pyramid is None:
+            return
+        
+        if x is None or y is None:
+            x = self.preview_canvas.winfo_width() // 2
+            y = self.preview_canvas.winfo_height() // 2
+        
+        old_zoom = self.current_zoom
+        new_zoom = min(MAX_ZOOM, max(min(self.fit_zoom, 1.0) / 2, old_zoom * factor))
+        origin_x, origin_y = self.preview_origin
+        self.preview_origin = (
+            int(round(x - (x - origin_x) * new_zoom / old_zoom)),
+            int(round(y - (y - origin_y) * new_zoom / old_zoom))
+        )
+        self.preview_zoom = new_zoom
+        self.render_preview()
+    
+    def set_preview_zoom(self, zoom):
+        if self.pyramid is not None:
+            self.zoom_preview(zoom / self.current_zoom)
+    
+    def fit_preview(self):
+        if self.pyramid is not None:
+            self.preview_zoom = None
+            self.render_preview()
+    
+    def on_preview_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.zoom_preview(ZOOM_STEP, event.x, event.y)
+        else:
+            self.zoom_preview(1 / ZOOM_STEP, event.x, event.y)
+    
+    def on_preview_press(self, event):
+        self.pan_start = (event.x, event.y, self.preview_origin)
+    
+    def on_preview_drag(self, event):
+        if self.pyramid is None or self.pan_start is None:
+            return
+        
+        start_x, start_y, (origin_x, origin_y) = self.pan_start
+        # Panning leaves fit mode at the current zoom
+        self.preview_zoom = self.current_zoom
+        self.preview_origin = (origin_x + event.x - start_x, origin_y + event.y - start_y)
+        self.render_preview()
+    
+    def on_preview_double_click(self, event):
+        if self.pyramid is None:
+            return
+        if self.preview_zoom is None:
+            self.zoom_preview(1.0 / self.current_zoom, event.x, event.y)
+        else:
+            self.fit_preview()
+    
     def browse_output(self):
         if self.conversion_in_progress:
             return
@@ -504,6 +768,23 @@ class ImagesToPDFConverterApp:
     def start_conversion(self):
         if self.conversion_in_progress or not self.image_paths or not self.output_pdf.get():
             return
+        
+        if self.scan_in_progress:
+            messagebox.showinfo("Scanning", "Please wait until all images have been scanned.")
+            return
+        
+        # Unreadable files were flagged by the scanner; settle them before starting
+        image_paths = [path for path in self.image_paths if not self.image_info.get(path, {}).get('error')]
+        unreadable = len(self.image_paths) - len(image_paths)
+        if unreadable:
+            if not image_paths:
+                messagebox.showerror("Error", "None of the images can be read.")
+                return
+            if not messagebox.askyesno(
+                "Unreadable Images",
+                f"{unreadable} image(s) cannot be read and will be skipped. Continue?"
+            ):
+                return
             
         output_path = self.output_pdf.get()
         
@@ -523,7 +804,7 @@ class ImagesToPDFConverterApp:
         
         thread = threading.Thread(
             target=self.convert_to_pdf,
-            args=(self.image_paths, output_path)
+            args=(image_paths, output_path)
         )
         thread.daemon = True
         thread.start()
@@ -531,6 +812,49 @@ class ImagesToPDFConverterApp:
         # Check thread status periodically
         self.check_thread(thread)
     
+    def start_plan(self):
+        if self.conversion_in_progress or not self.image_paths:
+            return
+        
+        self.plan_btn.config(state=tk.DISABLED)
+        self.update_status(f"Planning {len(self.image_paths)} image(s)...")
+        
+        thread = threading.Thread(
+            target=self.plan_conversion,
+            args=(list(self.image_paths),)
+        )
+        thread.daemon = True
+        thread.start()
+    
+    def plan_conversion(self, image_paths: List[str]):
+        try:
+            plan = plan_images(image_paths)
+        except Exception as e:
+            self.root.after(0, lambda: self.plan_btn.config(state=tk.NORMAL))
+            self.root.after(0, lambda msg=str(e): messagebox.showerror("Error", f"Failed to plan conversion: {msg}"))
+            return
+        self.root.after(0, lambda: self.show_plan(plan))
+    
+    def show_plan(self, plan):
+        self.plan_btn.config(state=tk.NORMAL)
+        self.update_status("Planning complete")
+        
+        text = format_plan(plan)
+        if not plan['unreadable']:
+            messagebox.showinfo("Conversion Plan", text)
+            return
+        
+        names = "\n".join(os.path.basename(p) for p in plan['unreadable'][:10])
+        if messagebox.askyesno("Conversion Plan", f"{text}\n\n{names}\n\nRemove the unreadable files from the list?"):
+            unreadable = set(plan['unreadable'])
+            for index in reversed(range(len(self.image_paths))):
+                if self.image_paths[index] in unreadable:
+                    self.listbox.delete(index)
+                    self.image_info.pop(self.image_paths.pop(index), None)
+            self.current_preview_index = -1
+            self.update_output_filename()
+            self.update_status(f"Removed {len(unreadable)} unreadable image(s)")
+    
     def check_thread(self, thread):
         if thread.is_alive():
             self.root.after(100, lambda: self.check_thread(thread))
@@ -539,54 +863,38 @@ class ImagesToPDFConverterApp:
             self.convert_btn.config(state=tk.NORMAL)
     
     def convert_to_pdf(self, image_paths: List[str], output_path: str):
+        def on_progress(i, total):
+            self.root.after(0, lambda: self.update_status(f"Processing image {i}/{total}"))
+        
+        def on_error(path, e):
+            self.root.after(0, lambda: messagebox.showwarning(
+                "Warning", 
+                f"Could not process {os.path.basename(path)}: {str(e)}"
+            ))
+        
         try:
-            # Convert all images to RGB mode (required for PDF)
-            images = []
-            for i, img_path in enumerate(image_paths, 1):
-                try:
-                    img = Image.open(img_path)
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    images.append(img)
-                    self.root.after(0, lambda i=i: self.update_status(f"Processing image {i}/{len(image_paths)}"))
-                except Exception as e:
-                    self.root.after(0, lambda e=e, p=img_path: messagebox.showwarning(
-                        "Warning", 
-                        f"Could not process {os.path.basename(p)}: {str(e)}"
-                    ))
+            # Every frame becomes a page; frames are streamed into the PDF
+            page_count = convert_images_to_pdf(
+                image_paths,
+                output_path,
+                resolution=100.0,
+                on_progress=on_progress,
+                on_error=on_error
+            )
             
-            if not images:
+            if not page_count:
                 self.root.after(0, lambda: messagebox.showerror("Error", "No valid images to convert"))
                 return
             
-            # Save first image as PDF and append the rest
-            if len(images) == 1:
-                images[0].save(output_path, "PDF", resolution=100.0)
-            else:
-                images[0].save(
-                    output_path, 
-                    "PDF", 
-                    resolution=100.0,
-                    save_all=True,
-                    append_images=images[1:]
-                )
-            
             self.root.after(0, lambda: self.update_status(f"Successfully created {os.path.basename(output_path)}"))
             self.root.after(0, lambda: messagebox.showinfo(
                 "Success", 
-                f"Successfully created PDF with {len(images)} pages\n\nSaved to:\n{output_path}"
+                f"Successfully created PDF with {page_count} pages\n\nSaved to:\n{output_path}"
             ))
             
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to create PDF: {str(e)}"))
             self.root.after(0, lambda: self.update_status("Conversion failed"))
-        finally:
-            # Close all images
-            for img in images:
-                try:
-                    img.close()
-                except:
-                    pass
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,166 @@
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pdf2image import pdfinfo_from_path
+
+# Bytes per pixel of a rendered page for each color mode
+BYTES_PER_PIXEL = {'rgb': 3, 'auto': 3, 'gray': 1, 'mono': 1}
+
+# pdf2image holds pdftoppm's raw output next to the decoded image
+RENDER_OVERHEAD = 2
+
+# Fraction of the budget at which measured RSS starts holding back new pages
+RSS_HIGH_WATER = 0.9
+
+# Seconds between RSS checks while throttled
+THROTTLE_INTERVAL = 0.25
+
+def page_sizes(pdf_path):
+    """
+    Return the size of every page of a PDF in points.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+
+    Returns:
+        list: (width, height) tuples in points, in page order
+    """
+    info = pdfinfo_from_path(pdf_path)
+    pages = info["Pages"]
+    default = _parse_page_size(info.get("Page size", ""))
+    if pages <= 1:
+        return [default] * pages
+
+    # Per-page sizes are only reported when a page range is requested
+    info = pdfinfo_from_path(pdf_path, first_page=1, last_page=pages)
+    sizes = [default] * pages
+    for key, value in info.items():
+        match = re.match(r'Page\s+(\d+) size', key)
+        if match and 1 <= int(match.group(1)) <= pages:
+            sizes[int(match.group(1)) - 1] = _parse_page_size(value)
+    return sizes
+
+def _parse_page_size(value):
+    # e.g. "612 x 792 pts (letter)"
+    match = re.match(r'\s*([\d.]+) x ([\d.]+)', str(value))
+    if not match:
+        # Unknown size, assume A4
+        return (595.0, 842.0)
+    return (float(match.group(1)), float(match.group(2)))
+
+def estimate_page_bytes(size, dpi, color='rgb'):
+    """
+    Estimate the memory needed to render one page.
+
+    Args:
+        size (tuple): Page (width, height) in points
+        dpi (int): Render DPI
+        color (str, optional): Color mode the page is rendered in. Defaults to 'rgb'.
+
+    Returns:
+        int: Estimated peak bytes while the page is rendered and saved
+    """
+    width, height = size
+    pixels = (width / 72.0 * dpi) * (height / 72.0 * dpi)
+    return int(pixels * BYTES_PER_PIXEL.get(color, 3) * RENDER_OVERHEAD)
+
+def total_memory():
+    """Return physical memory in bytes, or None if it cannot be determined."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def current_rss():
+    """Return the resident set size of this process in bytes, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def default_budget():
+    """Return the default memory budget: half of physical memory, or 2 GB if unknown."""
+    memory = total_memory()
+    return memory // 2 if memory else 2 * 1024 ** 3
+
+class MemoryGovernor:
+    """
+    Limit how much page memory is in flight across all conversions.
+
+    Callers acquire() the estimated size of a page before rendering it and
+    release() it once the page is saved. Acquisition blocks while the
+    estimates in flight would exceed the budget, or while the measured RSS of
+    the process is above RSS_HIGH_WATER of the budget. A single page is
+    always admitted when nothing else is in flight, so oversized pages cannot
+    deadlock; use fit_dpi() to keep them within the budget.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget or default_budget()
+        self.in_flight = 0
+        self.pages_in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, nbytes):
+        with self._condition:
+            while self.pages_in_flight and not self._has_room(nbytes):
+                # Woken by release(), or re-checked periodically while RSS is high
+                self._condition.wait(THROTTLE_INTERVAL)
+            self.in_flight += nbytes
+            self.pages_in_flight += 1
+
+    def release(self, nbytes):
+        with self._condition:
+            self.in_flight -= nbytes
+            self.pages_in_flight -= 1
+            self._condition.notify_all()
+
+    def _has_room(self, nbytes):
+        if self.in_flight + nbytes > self.budget:
+            return False
+        rss = current_rss()
+        return rss is None or rss < self.budget * RSS_HIGH_WATER
+
+    def worker_limit(self, page_bytes, requested):
+        """
+        Cap a worker count so that one page per worker fits the budget.
+
+        Args:
+            page_bytes (int): Estimated bytes of the largest page a worker renders
+            requested (int): Number of workers asked for
+
+        Returns:
+            int: Number of workers to run, at least 1
+        """
+        if page_bytes <= 0:
+            return max(1, requested)
+        return max(1, min(requested, self.budget // page_bytes))
+
+    def fit_dpi(self, size, dpi, color='rgb'):
+        """
+        Lower a DPI until a page of the given size fits the budget on its own.
+
+        Args:
+            size (tuple): Page (width, height) in points
+            dpi (int): Requested DPI
+            color (str, optional): Color mode the page is rendered in. Defaults to 'rgb'.
+
+        Returns:
+            int: The requested DPI, or the highest DPI that fits
+        """
+        page_bytes = estimate_page_bytes(size, dpi, color)
+        if page_bytes <= self.budget:
+            return dpi
+        # Memory grows with the square of the DPI
+        return max(1, int(dpi * (self.budget / page_bytes) ** 0.5))
+
+    @contextmanager
+    def page(self, nbytes):
+        """Hold nbytes of the budget for the duration of a with-block."""
+        self.acquire(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
@@ -1,10 +1,366 @@
 #!/usr/bin/env python3
 import os
+import io
+import sys
+import time
+import tarfile
+import zipfile
 import argparse
 from pathlib import Path
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import ImageChops, ImageFilter
+from memory_governor import MemoryGovernor, estimate_page_bytes, page_sizes
+from sharding import parse_shard, shard_files, shard_page_range, verify_output, write_manifest
 
-def convert_pdf_to_png(pdf_path, output_dir=None, dpi=200, fmt='png'):
+# Pillow format names for the extensions accepted on the command line
+PIL_FORMATS = {'png': 'PNG', 'jpeg': 'JPEG', 'jpg': 'JPEG', 'tiff': 'TIFF'}
+
+# Formats whose encoded bytes are already compressed and gain nothing from deflate
+COMPRESSED_FORMATS = {'png', 'jpeg', 'jpg'}
+
+ARCHIVE_FORMATS = ('zip', 'tar')
+
+COLOR_MODES = ('rgb', 'gray', 'mono', 'auto')
+
+# Most pages one governed poppler call renders, so other workers still get a turn
+GOVERNED_RUN_PAGES = 32
+
+# DPI of the throwaway render used to find the pages that need color in auto mode
+PROBE_DPI = 36
+
+# Pages probed per poppler call; only one chunk of probe images is held at a time
+PROBE_CHUNK_PAGES = 16
+
+# Largest channel difference still treated as gray (scanner/JPEG noise)
+GRAY_TOLERANCE = 12
+
+# Fraction of pixels that may differ from gray by more than GRAY_TOLERANCE
+COLOR_PIXEL_FRACTION = 0.001
+
+# Gray levels at/below and at/above these count as black and white for bilevel pages
+MONO_BLACK, MONO_WHITE = 48, 240
+
+# Gray level mono pages are thresholded at; darker pixels become black
+MONO_THRESHOLD = 128
+
+# Fraction of mid-tone pixels a bilevel page may contain
+MONO_MIDTONE_FRACTION = 0.3
+
+# Neighbourhood size within which an anti-aliased edge pixel finds the dark
+# core of its stroke
+MONO_EDGE_SIZE = 5
+
+# Fraction of mid-tone pixels that may lie away from anything the threshold
+# keeps. Edges of black content always touch its dark core; light-gray text,
+# hairlines and watermarks do not and would be erased.
+MONO_STRAY_FRACTION = 0.005
+
+# Mid-tone neighbourhood size that cannot be an anti-aliased edge
+MONO_SOLID_SIZE = 5
+
+# Fraction of pixels that may lie inside solid mid-tone areas (photos, shading)
+MONO_SOLID_FRACTION = 0.001
+
+def has_color(image):
+    """
+    Check whether a rendered page has more than a trace of color.
+    
+    Args:
+        image (PIL.Image.Image): Page rendering
+    
+    Returns:
+        bool: True if the page needs to be kept in RGB
+    """
+    if image.mode in ('1', 'L'):
+        return False
+    rgb = image.convert('RGB')
+    r, g, b = rgb.split()
+    # Per-pixel chroma: largest difference between any two channels
+    chroma = ImageChops.lighter(
+        ImageChops.lighter(ImageChops.difference(r, g), ImageChops.difference(g, b)),
+        ImageChops.difference(r, b)
+    )
+    colored = sum(chroma.histogram()[GRAY_TOLERANCE + 1:])
+    return colored > COLOR_PIXEL_FRACTION * rgb.width * rgb.height
+
+def classify_page(image):
+    """
+    Classify a rendered page as 'rgb', 'gray' or 'mono'.
+    
+    A page is 'mono' only if thresholding it at MONO_THRESHOLD keeps all of
+    its content: almost every mid-tone pixel has to be an anti-aliased edge
+    next to something the threshold keeps. Thin strokes blur into mid-tones
+    at low resolution, so this is only meaningful for the page as it will be
+    saved, not for a low-DPI probe.
+    
+    Args:
+        image (PIL.Image.Image): Page rendering
+    
+    Returns:
+        str: The cheapest color mode that preserves the page
+    """
+    if has_color(image):
+        return 'rgb'
+    gray = image.convert('L')
+    
+    area = gray.width * gray.height
+    histogram = gray.histogram()
+    midtones = sum(histogram[MONO_BLACK + 1:MONO_WHITE])
+    if midtones > MONO_MIDTONE_FRACTION * area:
+        return 'gray'
+    
+    # Mid-tones with nothing the threshold keeps next to them would vanish
+    mask = gray.point(lambda v: 255 if MONO_BLACK < v < MONO_WHITE else 0)
+    dark = gray.point(lambda v: 255 if v < MONO_THRESHOLD else 0).filter(ImageFilter.MaxFilter(MONO_EDGE_SIZE))
+    stray = ImageChops.subtract(mask, dark)
+    if stray.histogram()[255] > MONO_STRAY_FRACTION * midtones:
+        return 'gray'
+    # Edge fringes are a pixel or two wide; a solid patch of stray mid-tones is
+    # a stroke of gray ink, however little of it there is (a page number)
+    if stray.filter(ImageFilter.MinFilter(3)).histogram()[255]:
+        return 'gray'
+    
+    # Dark mid-tones survive the threshold, but solid areas of them are gray
+    # content (photos, shading) that would turn into black blobs
+    solid = mask.filter(ImageFilter.MinFilter(MONO_SOLID_SIZE)).histogram()[255]
+    if solid > MONO_SOLID_FRACTION * area:
+        return 'gray'
+    return 'mono'
+
+def detect_color_modes(pdf_path, first_page=None, last_page=None):
+    """
+    Find the pages of a PDF that need color from a cheap low-DPI render.
+    
+    Whether a grayscale page can be saved as mono is decided later, on the
+    full-resolution render (see classify_page()).
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        first_page (int, optional): First page to classify. Defaults to the first page.
+        last_page (int, optional): Last page to classify. Defaults to the last page.
+    
+    Returns:
+        list: 'rgb' or 'gray' for each page, in page order
+    """
+    first_page = first_page or 1
+    if last_page is None:
+        last_page = pdfinfo_from_path(pdf_path)["Pages"]
+    
+    modes = []
+    for start in range(first_page, last_page + 1, PROBE_CHUNK_PAGES):
+        end = min(last_page, start + PROBE_CHUNK_PAGES - 1)
+        for probe in convert_from_path(pdf_path, dpi=PROBE_DPI, first_page=start, last_page=end):
+            modes.append('rgb' if has_color(probe) else 'gray')
+            probe.close()
+    return modes
+
+def render_pages(pdf_path, dpi=200, color='rgb', governor=None, first_page=None, last_page=None, sizes=None):
+    """
+    Render the pages of a PDF in the requested color mode.
+    
+    Gray and mono pages are rendered by poppler in grayscale; mono pages are
+    then thresholded to 1-bit. In 'auto' mode a low-DPI probe finds the pages
+    that need color; the others are rendered in grayscale and saved as mono
+    when thresholding keeps all of their content. Consecutive pages of the
+    same kind are rendered together.
+    
+    With a governor, consecutive pages are rendered together as long as their
+    combined estimate fits the free part of the governor's budget, and the
+    run holds that memory until its pages are saved. The DPI is lowered if
+    the largest page would not fit the budget on its own.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        dpi (int, optional): DPI for the rendered pages. Defaults to 200.
+        color (str, optional): One of COLOR_MODES. Defaults to 'rgb'.
+        governor (MemoryGovernor, optional): Shared memory budget. Defaults to None.
+        first_page (int, optional): First page to render. Defaults to the first page.
+        last_page (int, optional): Last page to render. Defaults to the last page.
+        sizes (list, optional): Sizes of all pages from page_sizes(), if already known.
+            Only used with a governor.
+    
+    Yields:
+        tuple: (page number, PIL.Image.Image)
+    """
+    if color not in COLOR_MODES:
+        raise ValueError(f"Unsupported color mode: {color}")
+    
+    offset = (first_page or 1) - 1
+    modes = detect_color_modes(pdf_path, first_page, last_page) if color == 'auto' else None
+    
+    if governor is not None:
+        yield from _render_pages_governed(pdf_path, dpi, color, modes, governor, first_page, last_page, sizes)
+        return
+    
+    if modes is None:
+        images = convert_from_path(
+            pdf_path, dpi=dpi, first_page=first_page, last_page=last_page, grayscale=color != 'rgb'
+        )
+        for i, image in enumerate(images, start=offset + 1):
+            yield i, _to_color_mode(image, color)
+        return
+    
+    start = 0
+    while start < len(modes):
+        # Render runs of equally classified pages in a single poppler call
+        end = start
+        while end + 1 < len(modes) and modes[end + 1] == modes[start]:
+            end += 1
+        images = convert_from_path(
+            pdf_path, dpi=dpi, first_page=offset + start + 1, last_page=offset + end + 1,
+            grayscale=modes[start] != 'rgb'
+        )
+        for i, image in enumerate(images, start=offset + start + 1):
+            yield i, _to_detected_mode(image, modes[start])
+        start = end + 1
+
+def _render_pages_governed(pdf_path, dpi, color, modes, governor, first_page, last_page, sizes=None):
+    offset = (first_page or 1) - 1
+    if sizes is None:
+        sizes = page_sizes(pdf_path)
+    sizes = sizes[offset:last_page]
+    if not sizes:
+        return
+    
+    # Keep the whole document at one DPI, low enough for its largest page
+    largest = max(sizes, key=lambda size: size[0] * size[1])
+    fitted_dpi = governor.fit_dpi(largest, dpi, color)
+    if fitted_dpi < dpi:
+        print(f"Reducing DPI from {dpi} to {fitted_dpi} to fit the memory budget", file=sys.stderr)
+        dpi = fitted_dpi
+    
+    page_modes = modes or [color] * len(sizes)
+    convert = _to_detected_mode if modes else _to_color_mode
+    estimates = [estimate_page_bytes(size, dpi, mode) for size, mode in zip(sizes, page_modes)]
+    start = 0
+    while start < len(sizes):
+        # Extend the run with pages of the same mode while they fit the free budget
+        available = governor.budget - governor.in_flight
+        end = start + 1
+        run_bytes = estimates[start]
+        while (end < len(sizes) and end - start < GOVERNED_RUN_PAGES
+               and page_modes[end] == page_modes[start] and run_bytes + estimates[end] <= available):
+            run_bytes += estimates[end]
+            end += 1
+        
+        # The reservation is held until the caller has saved the run's last page and asks for the next
+        with governor.page(run_bytes):
+            images = convert_from_path(
+                pdf_path, dpi=dpi, first_page=offset + start + 1, last_page=offset + end,
+                grayscale=page_modes[start] != 'rgb'
+            )
+            for i, image in enumerate(images, start=offset + start + 1):
+                yield i, convert(image, page_modes[start])
+        start = end
+
+def _to_detected_mode(image, mode):
+    # Auto mode: grayscale pages become mono if thresholding keeps their content
+    return _to_color_mode(image, classify_page(image) if mode == 'gray' else mode)
+
+def _to_color_mode(image, color):
+    if color == 'mono':
+        return image.convert('L').point(lambda v: 255 if v >= MONO_THRESHOLD else 0, mode='1')
+    if color == 'gray' and image.mode != 'L':
+        return image.convert('L')
+    return image
+
+def save_page(image, target, fmt):
+    """
+    Save a rendered page, choosing format options that suit its mode.
+    
+    1-bit pages are written as Group 4 compressed TIFFs, and as grayscale
+    where the format has no 1-bit mode (JPEG).
+    
+    Args:
+        image (PIL.Image.Image): Rendered page
+        target (str or file): Output path or binary file object
+        fmt (str): Output image format
+    """
+    pil_format = PIL_FORMATS.get(fmt, fmt.upper())
+    options = {}
+    if image.mode == '1':
+        if pil_format == 'TIFF':
+            options['compression'] = 'group4'
+        elif pil_format == 'JPEG':
+            image = image.convert('L')
+    image.save(target, pil_format, **options)
+
+class PageArchive:
+    """
+    Write encoded pages as entries of a single ZIP or TAR stream.
+    
+    The target may be a path, '-' for stdout, or a writable binary file object.
+    Both formats are written sequentially, so non-seekable targets such as
+    pipes work.
+    """
+    
+    def __init__(self, target, archive_format=None):
+        if archive_format is None:
+            archive_format = archive_format_for(target)
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {archive_format}")
+        
+        self.archive_format = archive_format
+        self._owns_file = False
+        if target == '-':
+            fileobj = sys.stdout.buffer
+        elif isinstance(target, (str, os.PathLike)):
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            fileobj = open(target, 'wb')
+            self._owns_file = True
+        else:
+            fileobj = target
+        self._fileobj = fileobj
+        
+        if archive_format == 'zip':
+            self._archive = zipfile.ZipFile(fileobj, mode='w')
+        else:
+            # Stream mode never seeks back into the output
+            self._archive = tarfile.open(fileobj=fileobj, mode='w|')
+    
+    def add(self, name, data, compress=True):
+        """Add one entry. Entries with compress=False are stored uncompressed in ZIPs."""
+        if self.archive_format == 'zip':
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            info.external_attr = 0o644 << 16
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self._archive.addfile(info, io.BytesIO(data))
+    
+    def close(self):
+        self._archive.close()
+        if self._owns_file:
+            self._fileobj.close()
+        else:
+            self._fileobj.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def archive_format_for(target):
+    """
+    Infer the archive format from a target path.
+    
+    Args:
+        target (str): Archive path, or '-' for stdout
+    
+    Returns:
+        str: 'tar' for .tar paths, otherwise 'zip'
+    """
+    if target != '-' and isinstance(target, (str, os.PathLike)) and Path(target).suffix.lower() == '.tar':
+        return 'tar'
+    return 'zip'
+
+def convert_pdf_to_png(pdf_path, output_dir=None, dpi=200, fmt='png', archive=None, archive_format=None,
+                       color='rgb', governor=None, first_page=None, last_page=None):
     """
     Convert a PDF file to PNG images.
     
@@ -13,13 +369,30 @@ def convert_pdf_to_png(pdf_path, output_dir=None, dpi=200, fmt='png'):
         output_dir (str, optional): Directory to save the output images. Defaults to same as PDF.
         dpi (int, optional): DPI for the output image. Defaults to 200.
         fmt (str, optional): Output image format. Defaults to 'png'.
+        archive (str, optional): Write all pages into a single ZIP/TAR at this path
+            ('-' for stdout, or a binary file object) instead of separate files.
+            output_dir is ignored in this mode.
+        archive_format (str, optional): 'zip' or 'tar'. Defaults to the archive's extension.
+        color (str, optional): 'rgb', 'gray', 'mono' or 'auto' to detect the cheapest
+            mode for each page. Defaults to 'rgb'.
+        governor (MemoryGovernor, optional): Bound page memory to the governor's budget.
+            Defaults to None.
+        first_page (int, optional): First page to convert. Defaults to the first page.
+        last_page (int, optional): Last page to convert. Defaults to the last page.
     
     Returns:
-        list: List of paths to the generated image files
+        list: List of paths to the generated image files, or archive entry names
     """
     # Convert to Path object if it's a string
     pdf_path = Path(pdf_path)
     
+    # Get the base filename without extension
+    base_name = pdf_path.stem
+    
+    if archive is not None:
+        return _convert_pdf_to_archive(pdf_path, base_name, dpi, fmt, archive, archive_format, color, governor,
+                                       first_page, last_page)
+    
     # Set output directory
     if output_dir is None:
         output_dir = pdf_path.parent
@@ -29,46 +402,214 @@ def convert_pdf_to_png(pdf_path, output_dir=None, dpi=200, fmt='png'):
     # Create output directory if it doesn't exist
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Get the base filename without extension
-    base_name = pdf_path.stem
-    
     try:
-        # Convert PDF to images
-        images = convert_from_path(pdf_path, dpi=dpi)
-        
         saved_files = []
-        # Save each page as a separate image
-        for i, image in enumerate(images, start=1):
+        # Convert the PDF and save each page as a separate image
+        for i, image in render_pages(pdf_path, dpi=dpi, color=color, governor=governor,
+                                         first_page=first_page, last_page=last_page):
             output_path = output_dir / f"{base_name}_page_{i:03d}.{fmt}"
-            image.save(output_path, fmt.upper())
+            save_page(image, output_path, fmt)
             saved_files.append(str(output_path))
-            print(f"Saved: {output_path}")
+            print(f"Saved: {output_path} ({image.mode})")
             
-        print(f"\nSuccessfully converted {len(images)} pages.")
+        print(f"\nSuccessfully converted {len(saved_files)} pages.")
         return saved_files
         
     except Exception as e:
         print(f"Error converting {pdf_path}: {str(e)}")
         return []
 
+def _convert_pdf_to_archive(pdf_path, base_name, dpi, fmt, archive, archive_format, color, governor,
+                            first_page, last_page):
+    # Progress must not end up inside an archive written to stdout
+    log = sys.stderr if archive == '-' else sys.stdout
+    
+    try:
+        entries = []
+        with PageArchive(archive, archive_format) as page_archive:
+            for i, image in render_pages(pdf_path, dpi=dpi, color=color, governor=governor,
+                                         first_page=first_page, last_page=last_page):
+                name = f"{base_name}_page_{i:03d}.{fmt}"
+                buffer = io.BytesIO()
+                save_page(image, buffer, fmt)
+                page_archive.add(name, buffer.getvalue(), compress=fmt not in COMPRESSED_FORMATS)
+                image.close()
+                entries.append(name)
+                print(f"Archived: {name}", file=log)
+        
+        print(f"\nSuccessfully converted {len(entries)} pages.", file=log)
+        return entries
+        
+    except Exception as e:
+        print(f"Error converting {pdf_path}: {str(e)}", file=log)
+        return []
+
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Convert PDF files to PNG images.')
-    parser.add_argument('pdf_path', help='Path to the PDF file')
+    parser.add_argument('pdf_paths', nargs='+', metavar='pdf_path', help='Path to the PDF file (several for batch mode)')
     parser.add_argument('-o', '--output', help='Output directory (default: same as input file)')
     parser.add_argument('--dpi', type=int, default=200, help='DPI for the output image (default: 200)')
     parser.add_argument('--format', default='png', choices=['png', 'jpeg', 'jpg', 'tiff'], 
                         help='Output image format (default: png)')
+    parser.add_argument('--color', default='rgb', choices=COLOR_MODES,
+                        help="Color mode of the output; 'auto' keeps color only on pages that have it (default: rgb)")
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                        help='Render pages in runs that fit this memory budget, lowering the DPI if needed')
+    parser.add_argument('--archive', metavar='PATH',
+                        help="Write all pages into one ZIP/TAR archive instead of separate files ('-' for stdout)")
+    parser.add_argument('--archive-format', choices=ARCHIVE_FORMATS,
+                        help='Archive format (default: from the archive extension, zip for stdout)')
+    parser.add_argument('--shard', type=parse_shard, metavar='K/N',
+                        help='Only handle shard K of N (K from 1): a block of pages for a single PDF, '
+                             'or every Nth file in batch mode')
+    parser.add_argument('--verify', action='store_true',
+                        help='Check that every page was produced exactly once and merge shard manifests')
+    parser.add_argument('--plan', action='store_true',
+                        help='Estimate time, peak memory and output size from a few sample pages without converting')
     
     args = parser.parse_args()
+    fmt = args.format.lower()
     
-    # Convert the PDF
-    convert_pdf_to_png(
-        pdf_path=args.pdf_path,
-        output_dir=args.output,
-        dpi=args.dpi,
-        fmt=args.format.lower()
-    )
+    if args.verify:
+        return verify(args.pdf_paths, args.output, fmt)
+    
+    if args.archive and len(args.pdf_paths) > 1:
+        parser.error("--archive takes a single PDF")
+    if args.archive and args.shard:
+        # Every shard would truncate the same archive, and --verify only checks page files
+        parser.error("--archive cannot be combined with --shard")
+    
+    governor = MemoryGovernor(args.memory_budget * 1024 ** 2) if args.memory_budget else None
+    
+    if args.plan:
+        return plan(args.pdf_paths, args.dpi, fmt, args.color, governor)
+    pdf_paths = args.pdf_paths
+    batch = len(pdf_paths) > 1
+    if args.shard and batch:
+        pdf_paths = shard_files(pdf_paths, *args.shard)
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: {len(pdf_paths)} of {len(args.pdf_paths)} files")
+    
+    failed = False
+    for pdf_path in pdf_paths:
+        first_page = last_page = None
+        if args.shard:
+            try:
+                page_count = pdfinfo_from_path(pdf_path)["Pages"]
+            except Exception as e:
+                # Skip unreadable files rather than abandoning the rest of the shard
+                print(f"Error converting {pdf_path}: {str(e)}")
+                failed = True
+                continue
+            if not batch:
+                page_range = shard_page_range(page_count, *args.shard)
+                if page_range is None:
+                    # More shards than pages; record an empty share so --verify sees this shard ran
+                    print(f"Shard {args.shard[0]}/{args.shard[1]}: no pages to convert")
+                    write_manifest(args.output or Path(pdf_path).parent, Path(pdf_path).stem,
+                                   page_count, {}, *args.shard)
+                    continue
+                first_page, last_page = page_range
+                print(f"Shard {args.shard[0]}/{args.shard[1]}: pages {first_page}-{last_page} of {page_count}")
+        
+        # Convert the PDF
+        saved = convert_pdf_to_png(
+            pdf_path=pdf_path,
+            output_dir=args.output,
+            dpi=args.dpi,
+            fmt=fmt,
+            archive=args.archive,
+            archive_format=args.archive_format,
+            color=args.color,
+            governor=governor,
+            first_page=first_page,
+            last_page=last_page
+        )
+        failed = failed or not saved
+        
+        if args.shard:
+            # Record what this shard produced for --verify
+            output_dir = args.output or Path(pdf_path).parent
+            first = first_page or 1
+            pages = {first + i: path for i, path in enumerate(saved)}
+            write_manifest(output_dir, Path(pdf_path).stem, page_count, pages, *args.shard)
+    
+    return 1 if failed else 0
+
+def plan(pdf_paths, dpi, fmt, color, governor=None):
+    """
+    Print a conversion plan for the given PDFs.
+    
+    Args:
+        pdf_paths (list): Paths to the PDF files
+        dpi (int): Requested DPI
+        fmt (str): Output image format
+        color (str): Color mode
+        governor (MemoryGovernor, optional): Memory budget from --memory-budget. Defaults to None,
+            an ungoverned conversion.
+    
+    Returns:
+        int: 0 if every PDF could be planned, otherwise 1
+    """
+    # planner builds on this module, so it is imported only when needed
+    from planner import combine_plans, format_plan, plan_pdf
+    
+    plans = []
+    for pdf_path in pdf_paths:
+        try:
+            pdf_plan = plan_pdf(pdf_path, dpi=dpi, fmt=fmt, color=color, governor=governor)
+        except Exception as e:
+            print(f"Error planning {pdf_path}: {str(e)}")
+            continue
+        plans.append(pdf_plan)
+        print(f"{Path(pdf_path).name}:")
+        print("  " + format_plan(pdf_plan).replace("\n", "\n  "))
+    
+    if len(plans) > 1:
+        print(f"\nTotal for {len(plans)} files:")
+        print("  " + format_plan(combine_plans(plans)).replace("\n", "\n  "))
+    
+    if plans:
+        suggested_dpi = min(p['suggested_dpi'] for p in plans)
+        if governor is None:
+            # Without a budget every page of a document is held at once
+            budget = MemoryGovernor().budget
+            if max(p['peak_memory'] for p in plans) > budget:
+                print(f"\nSuggested options: --memory-budget {budget // 1024 ** 2}")
+        elif suggested_dpi < dpi:
+            print(f"\nSuggested options: --dpi {suggested_dpi} --memory-budget {governor.budget // 1024 ** 2}")
+    return 0 if len(plans) == len(pdf_paths) else 1
+
+def verify(pdf_paths, output_dir, fmt):
+    """
+    Verify the output of (possibly sharded) conversions of the given PDFs.
+    
+    Args:
+        pdf_paths (list): Paths to the PDF files
+        output_dir (str, optional): Output directory. Defaults to the directory of each PDF.
+        fmt (str): Image format extension of the pages
+    
+    Returns:
+        int: 0 if every page of every PDF was produced exactly once, otherwise 1
+    """
+    ok = True
+    for pdf_path in pdf_paths:
+        pdf_path = Path(pdf_path)
+        try:
+            page_count = pdfinfo_from_path(pdf_path)["Pages"]
+        except Exception as e:
+            ok = False
+            print(f"{pdf_path.name}: cannot read page count: {str(e)}")
+            continue
+        problems = verify_output(output_dir or pdf_path.parent, pdf_path.stem, page_count, fmt)
+        if problems:
+            ok = False
+            print(f"{pdf_path.name}: {len(problems)} problem(s)")
+            for problem in problems:
+                print(f"  {problem}")
+        else:
+            print(f"{pdf_path.name}: all {page_count} pages present")
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -8,35 +8,80 @@ from typing import Optional
 from pdf2image import convert_from_path
 from PIL import Image, ImageTk
 import threading
+import queue
+from pdf_to_png import COLOR_MODES, render_pages, save_page
+from memory_governor import MemoryGovernor, default_budget, estimate_page_bytes, page_sizes
+from planner import combine_plans, format_plan, plan_pdf
 
 class PDFToPNGConverterApp:
     def __init__(self, root):
         self.root = root
         self.root.title("PDF to PNG Converter")
-        self.root.geometry("600x400")
-        self.root.minsize(500, 350)
+        self.root.geometry("700x600")
+        self.root.minsize(600, 500)
         
         # Variables
         self.pdf_path = tk.StringVar()
         self.output_dir = tk.StringVar()
         self.dpi = tk.IntVar(value=200)
+        self.color = tk.StringVar(value='auto')
+        self.max_workers = tk.IntVar(value=2)
+        self.memory_budget = tk.IntVar(value=default_budget() // 1024 ** 2)
         self.status = tk.StringVar(value="Ready")
         self.progress = tk.DoubleVar()
-        self.conversion_in_progress = False
+        
+        # Job queue state. Only the Tk thread touches self.jobs and the widgets;
+        # workers report back through self.events.
+        self.jobs = {}
+        self.next_job_id = 1
+        self.job_queue = queue.Queue()
+        self.events = queue.Queue()
+        self.worker_lock = threading.Lock()
+        self.running_workers = 0
+        
+        # Shared by all workers so concurrent jobs stay within one memory budget
+        self.governor = MemoryGovernor(self.memory_budget.get() * 1024 ** 2)
+        self.worker_limit = self.max_workers.get()
         
         self.setup_ui()
+        self.process_events()
     
     def setup_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
         
-        # PDF File Selection
-        file_frame = ttk.LabelFrame(main_frame, text="PDF File", padding="10")
-        file_frame.pack(fill=tk.X, pady=(0, 10))
+        # Job Queue
+        jobs_frame = ttk.LabelFrame(main_frame, text="PDF Files", padding="10")
+        jobs_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        jobs_buttons = ttk.Frame(jobs_frame)
+        jobs_buttons.pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(jobs_buttons, text="Add PDFs...", command=self.browse_pdf).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(jobs_buttons, text="Remove Selected", command=self.remove_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(jobs_buttons, text="Clear Finished", command=self.clear_finished).pack(side=tk.LEFT, padx=5)
         
-        ttk.Entry(file_frame, textvariable=self.pdf_path, state='readonly').pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
-        ttk.Button(file_frame, text="Browse...", command=self.browse_pdf).pack(side=tk.RIGHT)
+        jobs_container = ttk.Frame(jobs_frame)
+        jobs_container.pack(fill=tk.BOTH, expand=True)
+        
+        scrollbar = ttk.Scrollbar(jobs_container)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.job_list = ttk.Treeview(
+            jobs_container,
+            columns=('status', 'progress'),
+            height=6,
+            yscrollcommand=scrollbar.set
+        )
+        self.job_list.heading('#0', text="File")
+        self.job_list.heading('status', text="Status")
+        self.job_list.heading('progress', text="Progress")
+        self.job_list.column('#0', width=300)
+        self.job_list.column('status', width=200)
+        self.job_list.column('progress', width=80, anchor=tk.E)
+        self.job_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.job_list.yview)
+        self.job_list.bind('<<TreeviewSelect>>', self.on_job_select)
         
         # Output Directory Selection
         output_frame = ttk.LabelFrame(main_frame, text="Output Directory", padding="10")
@@ -53,6 +98,18 @@ class PDFToPNGConverterApp:
         ttk.Label(options_frame, text="DPI:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
         ttk.Spinbox(options_frame, from_=72, to=600, textvariable=self.dpi, width=8).grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
         
+        # Color Mode Setting
+        ttk.Label(options_frame, text="Color:").grid(row=0, column=2, sticky=tk.W, padx=5, pady=5)
+        ttk.Combobox(options_frame, values=COLOR_MODES, textvariable=self.color, state='readonly', width=8).grid(row=0, column=3, sticky=tk.W, padx=5, pady=5)
+        
+        # Concurrent Workers Setting
+        ttk.Label(options_frame, text="Workers:").grid(row=0, column=4, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(options_frame, from_=1, to=16, textvariable=self.max_workers, width=4).grid(row=0, column=5, sticky=tk.W, padx=5, pady=5)
+        
+        # Memory Budget Setting
+        ttk.Label(options_frame, text="Memory (MB):").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Spinbox(options_frame, from_=256, to=1024 ** 2, increment=256, textvariable=self.memory_budget, width=8).grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        
         # Preview Frame
         self.preview_frame = ttk.LabelFrame(main_frame, text="Preview", padding="10")
         self.preview_frame.pack(fill=tk.BOTH, expand=True)
@@ -77,29 +134,68 @@ class PDFToPNGConverterApp:
         self.convert_btn = ttk.Button(button_frame, text="Convert to PNG", command=self.start_conversion)
         self.convert_btn.pack(side=tk.RIGHT, padx=(5, 0))
         
+        self.plan_btn = ttk.Button(button_frame, text="Plan...", command=self.start_plan)
+        self.plan_btn.pack(side=tk.RIGHT, padx=(5, 0))
+        
         ttk.Button(button_frame, text="Exit", command=self.root.quit).pack(side=tk.RIGHT)
         
         # Bind events
         self.pdf_path.trace_add('write', self.update_preview)
     
     def browse_pdf(self):
-        if self.conversion_in_progress:
-            return
-            
-        file_path = filedialog.askopenfilename(
-            title="Select PDF File",
+        file_paths = filedialog.askopenfilenames(
+            title="Select PDF Files",
             filetypes=[("PDF Files", "*.pdf"), ("All Files", "*.*")]
         )
-        if file_path:
-            self.pdf_path.set(file_path)
+        added = [file_path for file_path in file_paths if self.add_job(file_path)]
+        skipped = [os.path.basename(file_path) for file_path in file_paths if file_path not in added]
+        
+        if added:
             # Set default output directory to same as PDF if not set
             if not self.output_dir.get():
-                self.output_dir.set(str(Path(file_path).parent / "output"))
+                self.output_dir.set(str(Path(added[0]).parent / "output"))
+            self.status.set(f"Added {len(added)} PDF(s)")
+        if skipped:
+            messagebox.showwarning(
+                "Duplicate File Names",
+                "These PDFs were not added because a queued job already has the same name "
+                "and would overwrite its pages:\n\n" + "\n".join(skipped)
+            )
+    
+    def add_job(self, pdf_path: str) -> Optional[str]:
+        # All jobs write {stem}_page_NNN.png into the same output directory
+        stem = Path(pdf_path).stem
+        for job in self.jobs.values():
+            if job['state'] not in ('done', 'failed') and Path(job['path']).stem == stem:
+                return None
+        
+        job_id = str(self.next_job_id)
+        self.next_job_id += 1
+        self.jobs[job_id] = {'path': pdf_path, 'state': 'pending', 'progress': 0.0}
+        self.job_list.insert('', tk.END, iid=job_id, text=os.path.basename(pdf_path), values=("Pending", ""))
+        return job_id
+    
+    def remove_selected(self):
+        for job_id in self.job_list.selection():
+            # Queued and running jobs have to finish first
+            if self.jobs[job_id]['state'] in ('pending', 'done', 'failed'):
+                self.job_list.delete(job_id)
+                del self.jobs[job_id]
+        self.update_overall_progress()
+    
+    def clear_finished(self):
+        for job_id, job in list(self.jobs.items()):
+            if job['state'] in ('done', 'failed'):
+                self.job_list.delete(job_id)
+                del self.jobs[job_id]
+        self.update_overall_progress()
+    
+    def on_job_select(self, event=None):
+        selection = self.job_list.selection()
+        if selection:
+            self.pdf_path.set(self.jobs[selection[0]]['path'])
     
     def browse_output_dir(self):
-        if self.conversion_in_progress:
-            return
-            
         dir_path = filedialog.askdirectory(
             title="Select Output Directory"
         )
@@ -140,79 +236,203 @@ class PDFToPNGConverterApp:
             self.preview_label.config(text=f"Error loading preview: {str(e)}")
     
     def start_conversion(self):
-        if self.conversion_in_progress:
-            return
-            
-        pdf_path = self.pdf_path.get()
         output_dir = self.output_dir.get()
+        pending = [job_id for job_id, job in self.jobs.items() if job['state'] == 'pending']
         
-        if not pdf_path or not os.path.exists(pdf_path):
-            messagebox.showerror("Error", "Please select a valid PDF file.")
+        if not pending:
+            messagebox.showerror("Error", "Please add at least one PDF file.")
             return
             
         if not output_dir:
             messagebox.showerror("Error", "Please select an output directory.")
             return
-            
-        # Start conversion in a separate thread
-        self.conversion_in_progress = True
-        self.convert_btn.config(state=tk.DISABLED)
-        self.status.set("Converting...")
-        self.progress.set(0)
+        
+        # Options are captured per job, so later changes only affect new jobs
+        dpi = self.dpi.get()
+        color = self.color.get()
+        self.governor.budget = self.memory_budget.get() * 1024 ** 2
+        for job_id in pending:
+            job = self.jobs[job_id]
+            job['state'] = 'queued'
+            self.job_list.set(job_id, 'status', "Queued")
+            self.job_queue.put((job_id, job['path'], output_dir, dpi, color))
+        
+        # Workers report each job's largest page and the limit is lowered from there
+        if not self.running_workers:
+            self.worker_limit = self.max_workers.get()
+        self.start_workers()
+        self.status.set(f"Queued {len(pending)} job(s)")
+        self.update_overall_progress()
+    
+    def start_plan(self):
+        pending = [job['path'] for job in self.jobs.values() if job['state'] == 'pending']
+        if not pending:
+            messagebox.showerror("Error", "Please add at least one PDF file.")
+            return
+        
+        self.plan_btn.config(state=tk.DISABLED)
+        self.status.set(f"Planning {len(pending)} PDF(s)...")
+        self.governor.budget = self.memory_budget.get() * 1024 ** 2
         
         thread = threading.Thread(
-            target=self.convert_pdf,
-            args=(pdf_path, output_dir, self.dpi.get())
+            target=self.plan_jobs,
+            args=(pending, self.dpi.get(), self.color.get(), self.max_workers.get())
         )
         thread.daemon = True
         thread.start()
+    
+    def plan_jobs(self, pdf_paths, dpi: int, color: str, workers: int):
+        """Estimate the pending jobs. Runs on a worker thread and reports through self.events."""
+        plans = []
+        errors = []
+        for pdf_path in pdf_paths:
+            try:
+                plans.append(plan_pdf(pdf_path, dpi=dpi, color=color, workers=workers, governor=self.governor))
+            except Exception as e:
+                errors.append(f"{os.path.basename(pdf_path)}: {str(e)}")
+        self.events.put(('plan', None, (combine_plans(plans), errors)))
+    
+    def show_plan(self, plan, errors):
+        self.plan_btn.config(state=tk.NORMAL)
+        self.status.set("Planning complete")
+        
+        if plan is None:
+            messagebox.showerror("Error", "Could not plan any PDF:\n\n" + "\n".join(errors))
+            return
+        
+        text = format_plan(plan)
+        if errors:
+            text += "\n\nCould not plan:\n" + "\n".join(errors)
         
-        # Check thread status periodically
-        self.check_thread(thread)
+        changes = plan['suggested_workers'] != self.max_workers.get() or plan['suggested_dpi'] != self.dpi.get()
+        if not changes:
+            messagebox.showinfo("Conversion Plan", text)
+        elif messagebox.askyesno("Conversion Plan", f"{text}\n\nApply the suggested workers and DPI?"):
+            self.max_workers.set(plan['suggested_workers'])
+            self.dpi.set(plan['suggested_dpi'])
+    
+    def start_workers(self):
+        # Start workers up to the memory-capped limit; idle workers exit on their own
+        with self.worker_lock:
+            missing = max(1, self.worker_limit) - self.running_workers
+            self.running_workers += max(0, missing)
+        for _ in range(missing):
+            worker = threading.Thread(target=self.worker_loop)
+            worker.daemon = True
+            worker.start()
     
-    def check_thread(self, thread):
-        if thread.is_alive():
-            self.root.after(100, lambda: self.check_thread(thread))
+    def worker_loop(self):
+        while True:
+            with self.worker_lock:
+                # Workers beyond the memory-capped limit retire between jobs
+                if self.running_workers > max(1, self.worker_limit):
+                    self.running_workers -= 1
+                    return
+                try:
+                    job = self.job_queue.get_nowait()
+                except queue.Empty:
+                    self.running_workers -= 1
+                    return
+            try:
+                self.convert_pdf(*job)
+            finally:
+                self.job_queue.task_done()
+    
+    def process_events(self):
+        """Apply worker events to the job list. Runs on the Tk thread."""
+        try:
+            while True:
+                event, job_id, value = self.events.get_nowait()
+                if event == 'plan':
+                    self.show_plan(*value)
+                    continue
+                
+                job = self.jobs.get(job_id)
+                if job is None:
+                    continue
+                
+                if event == 'started':
+                    job['state'] = 'running'
+                    self.job_list.set(job_id, 'status', "Converting...")
+                elif event == 'page_bytes':
+                    # Run only as many workers as can each hold this job's largest page
+                    self.worker_limit = min(self.worker_limit, self.governor.worker_limit(value, self.max_workers.get()))
+                elif event == 'progress':
+                    done, total = value
+                    job['progress'] = done / total * 100 if total else 0.0
+                    note = f" ({job['note']})" if job.get('note') else ""
+                    self.job_list.set(job_id, 'status', f"Page {done} of {total}{note}")
+                    self.job_list.set(job_id, 'progress', f"{job['progress']:.0f}%")
+                elif event == 'done':
+                    job['state'] = 'done'
+                    job['progress'] = 100.0
+                    self.job_list.set(job_id, 'status', f"Done ({value} pages)")
+                    self.job_list.set(job_id, 'progress', "100%")
+                elif event == 'note':
+                    job['note'] = value
+                    self.job_list.set(job_id, 'status', value)
+                elif event == 'failed':
+                    job['state'] = 'failed'
+                    self.job_list.set(job_id, 'status', f"Failed: {value}")
+                self.update_overall_progress()
+        except queue.Empty:
+            pass
+        
+        # A worker may have exited just as new jobs were queued
+        if not self.job_queue.empty():
+            self.start_workers()
+        
+        self.root.after(100, self.process_events)
+    
+    def update_overall_progress(self):
+        active = [job for job in self.jobs.values() if job['state'] != 'pending']
+        if not active:
+            self.progress.set(0)
+            return
+        
+        self.progress.set(sum(job['progress'] for job in active) / len(active))
+        running = sum(1 for job in active if job['state'] == 'running')
+        queued = sum(1 for job in active if job['state'] == 'queued')
+        done = sum(1 for job in active if job['state'] == 'done')
+        failed = sum(1 for job in active if job['state'] == 'failed')
+        if running or queued:
+            self.status.set(f"{running} running, {queued} queued, {done} done, {failed} failed "
+                            f"({self.worker_limit} workers, {self.governor.in_flight // 1024 ** 2} MB in flight)")
         else:
-            self.conversion_in_progress = False
-            self.convert_btn.config(state=tk.NORMAL)
-            self.progress.set(100)
+            self.status.set(f"Conversion complete! {done} done, {failed} failed.")
     
-    def convert_pdf(self, pdf_path: str, output_dir: str, dpi: int):
+    def convert_pdf(self, job_id: str, pdf_path: str, output_dir: str, dpi: int, color: str = 'rgb'):
+        """Convert one job. Runs on a worker thread and only reports through self.events."""
         try:
+            self.events.put(('started', job_id, None))
+            
             # Create output directory if it doesn't exist
             output_path = Path(output_dir)
             output_path.mkdir(parents=True, exist_ok=True)
             
-            # Get PDF info
-            self.root.after(0, lambda: self.status.set("Loading PDF..."))
+            # Get PDF info once; the sizes are passed on to the renderer
+            sizes = page_sizes(pdf_path)
+            total_pages = len(sizes)
             
-            # Convert PDF to images
-            self.root.after(0, lambda: self.status.set("Converting pages..."))
-            images = convert_from_path(pdf_path, dpi=dpi)
+            if sizes:
+                largest = max(sizes, key=lambda size: size[0] * size[1])
+                fitted_dpi = self.governor.fit_dpi(largest, dpi, color)
+                self.events.put(('page_bytes', job_id, estimate_page_bytes(largest, fitted_dpi, color)))
+                if fitted_dpi < dpi:
+                    self.events.put(('note', job_id, f"DPI lowered to {fitted_dpi}"))
             
             # Save each page
             base_name = Path(pdf_path).stem
-            total_pages = len(images)
             
-            for i, image in enumerate(images, 1):
+            for i, image in render_pages(pdf_path, dpi=dpi, color=color, governor=self.governor, sizes=sizes):
                 output_file = output_path / f"{base_name}_page_{i:03d}.png"
-                image.save(output_file, 'PNG')
-                
-                # Update progress
-                progress = (i / total_pages) * 100
-                self.root.after(0, self.progress.set, progress)
-                self.root.after(0, self.status.set, f"Converting page {i} of {total_pages}...")
+                save_page(image, output_file, 'png')
+                self.events.put(('progress', job_id, (i, total_pages)))
             
-            self.root.after(0, lambda: self.status.set(f"Conversion complete! Saved {total_pages} images."))
-            messagebox.showinfo("Success", f"Successfully converted {total_pages} pages to PNG.")
+            self.events.put(('done', job_id, total_pages))
             
         except Exception as e:
-            self.root.after(0, lambda: self.status.set("Error during conversion"))
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to convert PDF: {str(e)}"))
-        finally:
-            self.root.after(0, lambda: setattr(self, 'conversion_in_progress', False))
-            self.root.after(0, lambda: self.convert_btn.config(state=tk.NORMAL))
+            self.events.put(('failed', job_id, str(e)))
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,257 @@
+import io
+import os
+import math
+import time
+from PIL import Image
+from pdf2image import convert_from_path
+from memory_governor import estimate_page_bytes, page_sizes
+from pdf_to_png import GOVERNED_RUN_PAGES, PROBE_CHUNK_PAGES, render_pages, save_page
+from images_to_pdf import LARGE_IMAGE_PIXELS, PDF_BATCH_PIXELS, to_pdf_mode
+
+# Number of pages/images actually converted to calibrate the estimates
+SAMPLE_SIZE = 3
+
+# DPI of the throwaway render that measures the fixed cost of one poppler call
+OVERHEAD_DPI = 1
+
+def sample_indices(count, samples=SAMPLE_SIZE):
+    """Return up to `samples` indices spread evenly over range(count), including both ends."""
+    if count <= samples:
+        return list(range(count))
+    if samples == 1:
+        return [0]
+    return sorted({round(i * (count - 1) / (samples - 1)) for i in range(samples)})
+
+def measure_call_overhead(pdf_path):
+    """
+    Measure the fixed cost of one poppler call (process start and PDF parsing).
+
+    Args:
+        pdf_path (str): Path to the PDF file
+
+    Returns:
+        float: Seconds taken to render the first page at OVERHEAD_DPI
+    """
+    started = time.perf_counter()
+    for image in convert_from_path(pdf_path, dpi=OVERHEAD_DPI, first_page=1, last_page=1):
+        image.close()
+    return time.perf_counter() - started
+
+def plan_pdf(pdf_path, dpi=200, fmt='png', color='rgb', workers=1, governor=None, samples=SAMPLE_SIZE):
+    """
+    Estimate the cost of converting a PDF without converting all of it.
+
+    A few pages spread over the document are rendered and encoded at the
+    requested settings; time and output size are then extrapolated by pixel
+    count using the page sizes reported by pdfinfo. The fixed cost of each
+    poppler call is measured separately, so it is counted once per call the
+    conversion will make rather than once per page.
+
+    Without a governor the estimate follows the ungoverned conversion, which
+    renders the requested DPI in one call and holds every page at once.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        dpi (int, optional): DPI for the output images. Defaults to 200.
+        fmt (str, optional): Output image format. Defaults to 'png'.
+        color (str, optional): Color mode. Defaults to 'rgb'.
+        workers (int, optional): Number of concurrent workers planned. Defaults to 1.
+        governor (MemoryGovernor, optional): Memory budget the conversion runs under.
+            Defaults to None, an ungoverned conversion.
+        samples (int, optional): Number of pages to render. Defaults to SAMPLE_SIZE.
+
+    Returns:
+        dict: pages, sampled pages, estimated seconds, peak memory and output
+        bytes, plus suggested_workers and suggested_dpi for the budget
+    """
+    sizes = page_sizes(pdf_path)
+    render_dpi = dpi
+    if governor is not None and sizes:
+        # A governed conversion lowers the DPI until its largest page fits the budget
+        largest = max(sizes, key=lambda size: size[0] * size[1])
+        render_dpi = governor.fit_dpi(largest, dpi, color)
+    suggested_dpi = render_dpi
+
+    def pixels(size):
+        return (size[0] / 72.0 * render_dpi) * (size[1] / 72.0 * render_dpi)
+
+    overhead = measure_call_overhead(pdf_path) if sizes else 0.0
+    # Auto color probes each page in a separate call before rendering it
+    calls_per_sample = 2 if color == 'auto' else 1
+
+    sampled_pixels = sampled_seconds = sampled_bytes = 0.0
+    sampled = []
+    for index in sample_indices(len(sizes), samples):
+        page = index + 1
+        started = time.perf_counter()
+        for _, image in render_pages(pdf_path, dpi=render_dpi, color=color, first_page=page, last_page=page):
+            buffer = io.BytesIO()
+            save_page(image, buffer, fmt)
+            sampled_bytes += buffer.tell()
+            image.close()
+        sampled_seconds += max(0.0, time.perf_counter() - started - calls_per_sample * overhead)
+        sampled_pixels += pixels(sizes[index])
+        sampled.append(page)
+
+    total_pixels = sum(pixels(size) for size in sizes)
+    scale = total_pixels / sampled_pixels if sampled_pixels else 0.0
+    estimates = [estimate_page_bytes(size, render_dpi, color) for size in sizes]
+    peak_page = max(estimates, default=0)
+
+    if governor is None:
+        # One poppler call for the whole document, whose pages are all held in memory
+        calls = 1
+        suggested_workers = 1
+        peak_memory = sum(estimates)
+    else:
+        # Runs of pages reserve up to the free budget, shared by all workers
+        calls = math.ceil(len(sizes) / GOVERNED_RUN_PAGES)
+        suggested_workers = governor.worker_limit(peak_page, max(1, workers))
+        peak_memory = max(peak_page, min(governor.budget, sum(estimates)))
+    if color == 'auto':
+        calls += math.ceil(len(sizes) / PROBE_CHUNK_PAGES)
+
+    seconds_serial = sampled_seconds * scale + calls * overhead
+    return {
+        'kind': 'pdf',
+        'inputs': 1,
+        'pages': len(sizes),
+        'sampled': sampled,
+        'dpi': dpi,
+        'suggested_dpi': suggested_dpi,
+        'suggested_workers': suggested_workers,
+        'seconds_serial': seconds_serial,
+        'seconds': seconds_serial / suggested_workers,
+        'peak_memory': peak_memory,
+        'output_bytes': int(sampled_bytes * scale),
+    }
+
+def plan_images(image_paths, samples=SAMPLE_SIZE):
+    """
+    Estimate the cost of combining images into a PDF.
+
+    Only image headers are read for all inputs; a few images are converted to
+    PDF in memory to calibrate time and output size per pixel.
+
+    Args:
+        image_paths (list): Paths to the input images
+        samples (int, optional): Number of images to convert. Defaults to SAMPLE_SIZE.
+
+    Returns:
+        dict: pages, unreadable files, estimated seconds, peak memory and output bytes
+    """
+    frames = []
+    unreadable = []
+    input_bytes = 0
+    for path in image_paths:
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+                frames.append((path, width * height, getattr(img, 'n_frames', 1)))
+            input_bytes += os.path.getsize(path)
+        except Exception:
+            unreadable.append(path)
+
+    sampled_pixels = sampled_seconds = sampled_bytes = 0.0
+    sampled = []
+    for index in sample_indices(len(frames), samples):
+        path, frame_pixels, _ = frames[index]
+        started = time.perf_counter()
+        try:
+            with Image.open(path) as img:
+                page = to_pdf_mode(img)
+                buffer = io.BytesIO()
+                page.save(buffer, 'PDF', resolution=100.0)
+                sampled_bytes += buffer.tell()
+        except Exception:
+            # The header was fine but the pixel data is not
+            unreadable.append(path)
+            continue
+        sampled_seconds += time.perf_counter() - started
+        sampled_pixels += frame_pixels
+        sampled.append(os.path.basename(path))
+
+    total_pixels = sum(frame_pixels * count for _, frame_pixels, count in frames)
+    scale = total_pixels / sampled_pixels if sampled_pixels else 0.0
+    largest = max((frame_pixels for _, frame_pixels, _ in frames), default=0)
+    # A batch of pages is buffered up to PDF_BATCH_PIXELS; large frames are
+    # written strip by strip, at worst next to their fully decoded source
+    if largest >= LARGE_IMAGE_PIXELS:
+        peak_memory = largest * 3
+    else:
+        peak_memory = (PDF_BATCH_PIXELS + largest) * 3 if frames else 0
+
+    return {
+        'kind': 'images',
+        'inputs': len(image_paths),
+        'pages': sum(count for _, _, count in frames),
+        'unreadable': unreadable,
+        'sampled': sampled,
+        'input_bytes': input_bytes,
+        'seconds': sampled_seconds * scale,
+        'peak_memory': peak_memory,
+        'output_bytes': int(sampled_bytes * scale),
+    }
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024.0
+
+def format_seconds(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+def format_plan(plan):
+    """
+    Format a plan from plan_pdf() or plan_images() as readable text.
+
+    Args:
+        plan (dict): Plan to format
+
+    Returns:
+        str: Multi-line summary
+    """
+    lines = [f"Pages: {plan['pages']} (sampled {len(plan['sampled'])})"]
+    if plan.get('unreadable'):
+        lines.append(f"Unreadable files: {len(plan['unreadable'])}")
+    lines.append(f"Estimated time: {format_seconds(plan['seconds'])}")
+    lines.append(f"Estimated peak memory: {format_bytes(plan['peak_memory'])}")
+    lines.append(f"Estimated output size: {format_bytes(plan['output_bytes'])}")
+    if 'suggested_workers' in plan:
+        lines.append(f"Workers: {plan['suggested_workers']}")
+        if plan['suggested_dpi'] < plan['dpi']:
+            lines.append(f"DPI lowered from {plan['dpi']} to {plan['suggested_dpi']} to fit the memory budget")
+    return "\n".join(lines)
+
+def combine_plans(plans):
+    """
+    Sum several PDF plans into one for a batch of documents.
+
+    Args:
+        plans (list): Plans from plan_pdf()
+
+    Returns:
+        dict: Combined plan; workers and DPI are the most conservative suggestions
+    """
+    if not plans:
+        return None
+    workers = min(plan['suggested_workers'] for plan in plans)
+    serial = sum(plan['seconds_serial'] for plan in plans)
+    return {
+        'kind': 'pdf',
+        'inputs': sum(plan['inputs'] for plan in plans),
+        'pages': sum(plan['pages'] for plan in plans),
+        'sampled': [page for plan in plans for page in plan['sampled']],
+        'dpi': max(plan['dpi'] for plan in plans),
+        'suggested_dpi': min(plan['suggested_dpi'] for plan in plans),
+        'suggested_workers': workers,
+        'seconds_serial': serial,
+        'seconds': serial / workers,
+        'peak_memory': max(plan['peak_memory'] // plan['suggested_workers'] for plan in plans) * workers,
+        'output_bytes': sum(plan['output_bytes'] for plan in plans),
+    }
@@ -0,0 +1,166 @@
+import os
+import re
+import glob
+import json
+import argparse
+from pathlib import Path
+
+def parse_shard(value):
+    """
+    Parse a 'K/N' shard specification (K counts from 1).
+
+    Args:
+        value (str): Shard specification, e.g. '3/8'
+
+    Returns:
+        tuple: (K, N)
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', expected K/N")
+    shard, shards = int(match.group(1)), int(match.group(2))
+    if shards < 1 or not 1 <= shard <= shards:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', K must be between 1 and N")
+    return shard, shards
+
+def shard_page_range(page_count, shard, shards):
+    """
+    Return the contiguous page range handled by one shard.
+
+    Pages are split into N nearly equal blocks, so each shard renders its
+    pages with a single poppler call.
+
+    Args:
+        page_count (int): Number of pages in the document
+        shard (int): Shard number, from 1 to shards
+        shards (int): Total number of shards
+
+    Returns:
+        tuple: (first_page, last_page), or None if the shard has no pages
+    """
+    first = (shard - 1) * page_count // shards + 1
+    last = shard * page_count // shards
+    if first > last:
+        return None
+    return first, last
+
+def shard_files(paths, shard, shards):
+    """
+    Return the files handled by one shard in batch mode.
+
+    Files are sorted first, so every invocation agrees on the assignment
+    regardless of the order they were passed in.
+
+    Args:
+        paths (list): Input file paths
+        shard (int): Shard number, from 1 to shards
+        shards (int): Total number of shards
+
+    Returns:
+        list: Paths assigned to this shard
+    """
+    ordered = sorted(set(str(p) for p in paths))
+    return [p for i, p in enumerate(ordered) if i % shards == shard - 1]
+
+def manifest_path(output_dir, base_name, shard, shards):
+    return Path(output_dir) / f"{base_name}.shard-{shard}-of-{shards}.json"
+
+def write_manifest(output_dir, base_name, page_count, saved_files, shard, shards):
+    """
+    Record the pages one shard produced for the verify step.
+
+    Args:
+        output_dir (str): Output directory shared by all shards
+        base_name (str): Base name of the document
+        page_count (int): Number of pages in the document
+        saved_files (dict): Page number -> path of the saved image
+        shard (int): Shard number
+        shards (int): Total number of shards
+
+    Returns:
+        Path: Path of the manifest
+    """
+    manifest = {
+        'document': base_name,
+        'page_count': page_count,
+        'shard': shard,
+        'shards': shards,
+        'pages': {
+            str(page): {'file': os.path.basename(path), 'size': os.path.getsize(path)}
+            for page, path in saved_files.items()
+        },
+    }
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    path = manifest_path(output_dir, base_name, shard, shards)
+    tmp = path.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, path)
+    return path
+
+def verify_output(output_dir, base_name, page_count, fmt):
+    """
+    Check that every page of a document was produced exactly once.
+
+    Shard manifests are merged into '<base>.manifest.json' and removed when
+    the check passes. Without shard manifests, the expected page files are
+    checked directly.
+
+    Args:
+        output_dir (str): Output directory shared by all shards
+        base_name (str): Base name of the document
+        page_count (int): Number of pages in the document
+        fmt (str): Image format extension of the pages
+
+    Returns:
+        list: Problems found; empty if the output is complete
+    """
+    output_dir = Path(output_dir)
+    manifests = sorted(output_dir.glob(f"{glob.escape(base_name)}.shard-*-of-*.json"))
+    problems = []
+    pages = {}
+    counts = {}
+
+    for manifest_file in manifests:
+        manifest = json.loads(manifest_file.read_text())
+        if manifest.get('page_count') != page_count:
+            problems.append(f"{manifest_file.name}: page count {manifest.get('page_count')}, expected {page_count}")
+        for page, entry in manifest['pages'].items():
+            page = int(page)
+            counts[page] = counts.get(page, 0) + 1
+            pages[page] = entry
+
+    if not manifests:
+        for page in range(1, page_count + 1):
+            path = output_dir / f"{base_name}_page_{page:03d}.{fmt}"
+            if path.exists():
+                counts[page] = 1
+                pages[page] = {'file': path.name, 'size': path.stat().st_size}
+
+    for page in range(1, page_count + 1):
+        count = counts.get(page, 0)
+        if count == 0:
+            problems.append(f"page {page}: missing")
+        elif count > 1:
+            problems.append(f"page {page}: produced {count} times")
+        else:
+            entry = pages[page]
+            path = output_dir / entry['file']
+            if not path.exists():
+                problems.append(f"page {page}: {entry['file']} does not exist")
+            elif path.stat().st_size != entry['size'] or entry['size'] == 0:
+                problems.append(f"page {page}: {entry['file']} is {path.stat().st_size} bytes, expected {entry['size']}")
+
+    extra = sorted(page for page in counts if not 1 <= page <= page_count)
+    problems.extend(f"page {page}: beyond the last page" for page in extra)
+
+    if not problems and manifests:
+        merged = {
+            'document': base_name,
+            'page_count': page_count,
+            'pages': {str(page): pages[page] for page in sorted(pages)},
+        }
+        (output_dir / f"{base_name}.manifest.json").write_text(json.dumps(merged, indent=2))
+        for manifest_file in manifests:
+            manifest_file.unlink()
+
+    return problems
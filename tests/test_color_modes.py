@@ -0,0 +1,102 @@
+from PIL import Image, ImageDraw
+import pdf_to_png
+from pdf_to_png import classify_page, has_color, render_pages, _to_color_mode
+
+PAGE_SIZE = (850, 1100)
+
+
+def render(draw_page, mode='L'):
+    """Draw a page at 4x and box-downscale it, which anti-aliases edges like a renderer."""
+    page = Image.new(mode, (PAGE_SIZE[0] * 4, PAGE_SIZE[1] * 4), 'white')
+    draw_page(ImageDraw.Draw(page))
+    return page.reduce(4)
+
+
+def text_lines(draw, fill=0, top=200, lines=25, height=24):
+    # Rows of glyph-like strokes: verticals, a diagonal and a thin bar, about 10pt at 100 DPI
+    for line in range(lines):
+        y = (top + line * 30) * 4
+        for x in range(100 * 4, 750 * 4, 40):
+            draw.rectangle((x, y, x + 6, y + height * 2), fill=fill)
+            draw.line((x + 10, y + height * 2, x + 26, y), fill=fill, width=6)
+            draw.rectangle((x + 10, y + height, x + 30, y + height + 5), fill=fill)
+
+
+def test_blank_page_is_mono():
+    assert classify_page(Image.new('L', PAGE_SIZE, 255)) == 'mono'
+
+
+def test_black_text_is_mono():
+    assert classify_page(render(text_lines)) == 'mono'
+
+
+def test_black_text_in_rgb_rendering_is_mono():
+    assert classify_page(render(text_lines, 'RGB')) == 'mono'
+
+
+def test_gray_footer_text_is_gray():
+    def page(draw):
+        text_lines(draw)
+        text_lines(draw, fill=0x99, top=1050, lines=1)
+    image = render(page)
+    assert classify_page(image) == 'gray'
+    # Thresholding would have erased the footer completely
+    footer = _to_color_mode(image.crop((0, 1040, 850, 1090)), 'mono')
+    assert footer.convert('L').getextrema() == (255, 255)
+
+
+def test_gray_page_number_is_gray():
+    def page(draw):
+        text_lines(draw)
+        draw.rectangle((420 * 4, 1060 * 4, 426 * 4, 1080 * 4), fill=0x99)
+    assert classify_page(render(page)) == 'gray'
+
+
+def test_gray_hairline_is_gray():
+    def page(draw):
+        text_lines(draw)
+        draw.line((100 * 4, 1060 * 4, 750 * 4, 1060 * 4), fill=0x99, width=4)
+    assert classify_page(render(page)) == 'gray'
+
+
+def test_light_shading_is_gray():
+    def page(draw):
+        draw.rectangle((100 * 4, 100 * 4, 750 * 4, 400 * 4), fill=230)
+        text_lines(draw, top=500)
+    assert classify_page(render(page)) == 'gray'
+
+
+def test_photo_is_gray():
+    image = render(text_lines)
+    image.paste(Image.radial_gradient('L').resize((200, 200)), (300, 400))
+    assert classify_page(image) == 'gray'
+
+
+def test_color_is_rgb():
+    image = render(text_lines, 'RGB')
+    image.paste((200, 30, 30), (100, 100, 150, 150))
+    assert has_color(image)
+    assert classify_page(image) == 'rgb'
+    assert not has_color(image.convert('L'))
+
+
+def test_auto_mode_decides_mono_on_the_full_render(monkeypatch):
+    color_page = render(text_lines, 'RGB')
+    color_page.paste((200, 30, 30), (100, 100, 150, 150))
+
+    def footer_page(draw):
+        text_lines(draw)
+        text_lines(draw, fill=0x99, top=1050, lines=1)
+
+    pages = [color_page, render(text_lines), render(footer_page)]
+    calls = []
+
+    def fake_convert_from_path(pdf_path, dpi, first_page, last_page, grayscale=False):
+        calls.append((dpi, first_page, last_page, grayscale))
+        return [page.convert('L' if grayscale else 'RGB') for page in pages[first_page - 1:last_page]]
+
+    monkeypatch.setattr(pdf_to_png, 'convert_from_path', fake_convert_from_path)
+    rendered = list(render_pages('doc.pdf', dpi=200, color='auto', first_page=1, last_page=3))
+    assert [(number, image.mode) for number, image in rendered] == [(1, 'RGB'), (2, '1'), (3, 'L')]
+    # One probe, then the color page and the two grayscale pages in one call
+    assert calls == [(pdf_to_png.PROBE_DPI, 1, 3, False), (200, 1, 1, False), (200, 2, 3, True)]
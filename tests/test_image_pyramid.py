@@ -0,0 +1,44 @@
+from PIL import Image, ImageChops
+from image_pyramid import ImagePyramid, scale_tile
+
+
+def make_image(tmp_path, size=(1000, 700)):
+    path = str(tmp_path / 'photo.png')
+    Image.radial_gradient('L').resize(size).convert('RGB').save(path)
+    return path
+
+
+def test_tiles_are_cached_at_level_resolution(tmp_path):
+    pyramid = ImagePyramid(make_image(tmp_path), tile_size=256)
+    assert pyramid.max_level == 2
+    assert pyramid.cached_tile(0, 1, 1) is None
+
+    tile = pyramid.tile(0, 1, 1)
+    assert tile.size == (256, 256)
+    assert pyramid.cached_tile(0, 1, 1) is tile
+    # Edge tiles are cut to the image
+    assert pyramid.tile(0, 3, 2).size == (1000 - 768, 700 - 512)
+    assert pyramid.tile(2, 0, 0).size == (250, 175)
+
+
+def test_tile_matches_source(tmp_path):
+    path = make_image(tmp_path)
+    pyramid = ImagePyramid(path, tile_size=256)
+    with Image.open(path) as img:
+        expected = img.crop(pyramid.tile_box(0, 2, 1))
+    assert ImageChops.difference(pyramid.tile(0, 2, 1), expected).getbbox() is None
+
+
+def test_cache_is_bounded(tmp_path):
+    pyramid = ImagePyramid(make_image(tmp_path), tile_size=64, max_tiles=5)
+    for col in range(8):
+        pyramid.tile(0, col, 0)
+    assert pyramid.cached_tile(0, 2, 0) is None
+    assert pyramid.cached_tile(0, 7, 0) is not None
+
+
+def test_scale_tile():
+    tile = Image.new('RGB', (256, 256))
+    assert scale_tile(tile, (256, 256)) is tile
+    assert scale_tile(tile, (2048, 2048)).size == (2048, 2048)
+    assert scale_tile(tile, (100, 100)).size == (100, 100)
@@ -0,0 +1,153 @@
+import io
+import struct
+import pytest
+from PIL import Image, ImageChops, ImageStat, PdfParser
+import images_to_pdf
+from images_to_pdf import (
+    natural_sort_key, find_images, can_decode_rows, row_bands, decode_box, convert_images_to_pdf
+)
+
+
+def test_natural_sort_orders_numbers_by_value():
+    names = ['page10.png', 'page2.png', 'page1.png', 'Page3.png']
+    assert sorted(names, key=natural_sort_key) == ['page1.png', 'page2.png', 'Page3.png', 'page10.png']
+
+
+def test_natural_sort_mixed_text_and_numbers():
+    names = ['b1', 'a10', 'a2', '10', '9', 'a2b']
+    assert sorted(names, key=natural_sort_key) == ['9', '10', 'a2', 'a2b', 'a10', 'b1']
+
+
+def test_natural_sort_leading_zeros():
+    names = ['scan_010.tif', 'scan_9.tif', 'scan_0011.tif']
+    assert sorted(names, key=natural_sort_key) == ['scan_9.tif', 'scan_010.tif', 'scan_0011.tif']
+
+
+def test_find_images_recurses_in_natural_order(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / '.hidden').mkdir()
+    for name in ('img10.png', 'img2.JPG', 'notes.txt', '.thumb.png', 'sub/img1.tif', '.hidden/img3.png'):
+        (tmp_path / name).write_bytes(b'')
+
+    found = [p[len(str(tmp_path)) + 1:] for p in find_images(str(tmp_path))]
+    assert found == ['img2.JPG', 'img10.png', 'sub/img1.tif']
+    assert len(find_images(str(tmp_path), recursive=False)) == 2
+
+
+def write_striped_tiff(path, image, rows_per_strip):
+    """Write an uncompressed L or RGB TIFF with one strip per rows_per_strip rows."""
+    samples = len(image.getbands())
+    stride = image.width * samples
+    data = image.tobytes()
+    strips = [data[top * stride:(top + rows_per_strip) * stride] for top in range(0, image.height, rows_per_strip)]
+
+    entries = [(256, 4, [image.width]), (257, 4, [image.height]), (258, 3, [8] * samples), (259, 3, [1]),
+               (262, 3, [2 if samples == 3 else 1]), (273, 4, None), (277, 3, [samples]),
+               (278, 4, [rows_per_strip]), (279, 4, [len(strip) for strip in strips]), (284, 3, [1])]
+    ifd_size = 2 + 12 * len(entries) + 4
+    extra = b''
+    data_start = 8 + ifd_size + 4 * len(strips) * 2 + 2 * samples
+    offsets = []
+    position = data_start
+    for strip in strips:
+        offsets.append(position)
+        position += len(strip)
+
+    ifd = struct.pack('<H', len(entries))
+    for tag, kind, values in entries:
+        values = offsets if tag == 273 else values
+        packed = struct.pack('<%d%s' % (len(values), 'H' if kind == 3 else 'I'), *values)
+        if len(packed) <= 4:
+            ifd += struct.pack('<HHI', tag, kind, len(values)) + packed.ljust(4, b'\0')
+        else:
+            ifd += struct.pack('<HHII', tag, kind, len(values), 8 + ifd_size + len(extra))
+            extra += packed
+    ifd += struct.pack('<I', 0)
+    header = b'II*\0' + struct.pack('<I', 8) + ifd + extra
+    with open(path, 'wb') as f:
+        f.write(header.ljust(data_start, b'\0') + b''.join(strips))
+
+
+@pytest.fixture
+def striped_tiff(tmp_path):
+    image = Image.radial_gradient('L').resize((300, 1200)).convert('RGB')
+    image.paste((200, 40, 40), (0, 500, 300, 700))
+    path = str(tmp_path / 'striped.tif')
+    write_striped_tiff(path, image, 16)
+    return path, image
+
+
+def strip_images(pdf_path):
+    """Decode the strip XObjects of every page of a PDF."""
+    pdf = PdfParser.PdfParser(filename=pdf_path)
+    try:
+        pages = []
+        for page_ref in pdf.pages:
+            page = pdf.read_indirect(page_ref)
+            xobjects = page[b'Resources'][b'XObject']
+            pages.append([Image.open(io.BytesIO(pdf.read_indirect(xobjects[name]).buf))
+                          for name in sorted(xobjects, key=lambda name: (len(name.name), name.name))])
+        return pages
+    finally:
+        pdf.close()
+
+
+def difference(a, b):
+    return max(high for low, high in ImageChops.difference(a.convert('RGB'), b.convert('RGB')).getextrema())
+
+
+def test_striped_tiff_decodes_by_band(striped_tiff):
+    path, image = striped_tiff
+    with Image.open(path) as img:
+        assert can_decode_rows(img)
+        tiles = list(img.tile)
+        bands = row_bands(img)
+    assert [(top, bottom) for top, bottom, _ in bands] == [(0, 512), (512, 1024), (1024, 1200)]
+
+    box = (37, 250, 290, 733)
+    region = decode_box(path, 0, tiles, box)
+    assert region.size == (253, 483)
+    assert difference(region, image.crop(box)) == 0
+
+
+def test_large_striped_tiff_written_as_strips(tmp_path, striped_tiff, monkeypatch):
+    monkeypatch.setattr(images_to_pdf, 'LARGE_IMAGE_PIXELS', 300 * 1200)
+    path, image = striped_tiff
+    small = str(tmp_path / 'small.png')
+    Image.new('RGB', (40, 30), 'blue').save(small)
+    output = str(tmp_path / 'out.pdf')
+
+    assert convert_images_to_pdf([small, path, small], output) == 3
+    pages = strip_images(output)
+    assert [len(strips) for strips in pages] == [1, 3, 1]
+    strips = pages[1]
+    assert [strip.size for strip in strips] == [(300, 512), (300, 512), (300, 176)]
+    page = Image.new('RGB', image.size)
+    for strip, top in zip(strips, (0, 512, 1024)):
+        page.paste(strip, (0, top))
+    # JPEG-encoded, so only close to the source
+    assert ImageStat.Stat(ImageChops.difference(page, image)).mean[0] < 2
+
+
+def test_failed_strip_leaves_pdf_valid(tmp_path, striped_tiff, monkeypatch):
+    monkeypatch.setattr(images_to_pdf, 'LARGE_IMAGE_PIXELS', 300 * 1200)
+    path, _ = striped_tiff
+    small = str(tmp_path / 'small.png')
+    Image.new('RGB', (40, 30), 'blue').save(small)
+    output = str(tmp_path / 'out.pdf')
+
+    decode_region = images_to_pdf.decode_region
+    calls = []
+
+    def failing_decode_region(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise OSError('truncated strip')
+        return decode_region(*args)
+
+    monkeypatch.setattr(images_to_pdf, 'decode_region', failing_decode_region)
+    errors = []
+    written = convert_images_to_pdf([small, path, small], output, on_error=lambda p, e: errors.append(p))
+    assert errors == [path]
+    assert written == 2
+    assert [len(strips) for strips in strip_images(output)] == [1, 1]
@@ -0,0 +1,96 @@
+import time
+import threading
+import pytest
+import memory_governor
+from memory_governor import MemoryGovernor, estimate_page_bytes, _parse_page_size
+
+LETTER = (612.0, 792.0)
+
+
+@pytest.fixture(autouse=True)
+def no_rss(monkeypatch):
+    # Keep the budget checks independent of the test process's own memory use
+    monkeypatch.setattr(memory_governor, 'current_rss', lambda: None)
+
+
+def test_estimate_page_bytes():
+    # 8.5 x 11 in at 100 DPI, RGB, with the render overhead
+    assert estimate_page_bytes(LETTER, 100) == 850 * 1100 * 3 * memory_governor.RENDER_OVERHEAD
+    assert estimate_page_bytes(LETTER, 100, 'gray') == estimate_page_bytes(LETTER, 100) // 3
+
+
+def test_parse_page_size():
+    assert _parse_page_size('612 x 792 pts (letter)') == LETTER
+    assert _parse_page_size('595.276 x 841.89 pts (A4)') == (595.276, 841.89)
+    assert _parse_page_size('') == (595.0, 842.0)
+
+
+def test_worker_limit():
+    governor = MemoryGovernor(1000)
+    assert governor.worker_limit(300, 8) == 3
+    assert governor.worker_limit(300, 2) == 2
+    assert governor.worker_limit(5000, 4) == 1
+    assert governor.worker_limit(0, 4) == 4
+
+
+def test_fit_dpi():
+    page_bytes = estimate_page_bytes(LETTER, 200)
+    assert MemoryGovernor(page_bytes).fit_dpi(LETTER, 200) == 200
+    fitted = MemoryGovernor(page_bytes // 4).fit_dpi(LETTER, 200)
+    assert fitted <= 100
+    assert estimate_page_bytes(LETTER, fitted) <= page_bytes // 4
+
+
+def test_acquire_blocks_until_released():
+    governor = MemoryGovernor(100)
+    governor.acquire(60)
+    acquired = threading.Event()
+
+    def second():
+        governor.acquire(60)
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.3)
+
+    governor.release(60)
+    assert acquired.wait(2)
+    thread.join()
+    assert governor.in_flight == 60
+    assert governor.pages_in_flight == 1
+
+
+def test_oversized_page_admitted_when_idle():
+    governor = MemoryGovernor(100)
+    with governor.page(500):
+        assert governor.in_flight == 500
+    assert governor.in_flight == 0
+    assert governor.pages_in_flight == 0
+
+
+def test_page_releases_on_error():
+    governor = MemoryGovernor(100)
+    with pytest.raises(RuntimeError):
+        with governor.page(50):
+            raise RuntimeError
+    assert governor.in_flight == 0
+
+
+def test_concurrent_pages_stay_within_budget():
+    governor = MemoryGovernor(100)
+    peak = []
+
+    def worker():
+        for _ in range(5):
+            with governor.page(40):
+                peak.append(governor.in_flight)
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 100
+    assert governor.in_flight == 0
@@ -0,0 +1,114 @@
+import json
+import argparse
+import pytest
+from sharding import parse_shard, shard_page_range, shard_files, write_manifest, verify_output
+
+
+def test_parse_shard():
+    assert parse_shard('3/8') == (3, 8)
+    assert parse_shard(' 1 / 1 ') == (1, 1)
+
+
+@pytest.mark.parametrize('value', ['0/3', '4/3', '1/0', 'a/b', '3', '-1/2'])
+def test_parse_shard_rejects_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+@pytest.mark.parametrize('page_count', [0, 1, 2, 7, 8, 9, 100])
+@pytest.mark.parametrize('shards', [1, 2, 3, 8, 13])
+def test_shard_page_ranges_partition_the_document(page_count, shards):
+    pages = []
+    for shard in range(1, shards + 1):
+        page_range = shard_page_range(page_count, shard, shards)
+        if page_range is None:
+            continue
+        first, last = page_range
+        assert first <= last
+        pages.extend(range(first, last + 1))
+    # Every page exactly once, in order
+    assert pages == list(range(1, page_count + 1))
+
+
+def test_shard_page_ranges_are_balanced():
+    sizes = [last - first + 1 for first, last in (shard_page_range(10, k, 3) for k in range(1, 4))]
+    assert max(sizes) - min(sizes) <= 1
+
+
+def test_shard_files_partition_independent_of_order():
+    paths = [f"doc{i}.pdf" for i in range(10)]
+    shards = [shard_files(paths, k, 3) for k in range(1, 4)]
+    assert sorted(p for shard in shards for p in shard) == sorted(paths)
+    assert shard_files(list(reversed(paths)), 2, 3) == shards[1]
+
+
+def test_shard_files_ignores_duplicates():
+    assert shard_files(['b.pdf', 'a.pdf', 'b.pdf'], 1, 1) == ['a.pdf', 'b.pdf']
+
+
+def write_pages(output_dir, pages, base='doc', fmt='png'):
+    saved = {}
+    for page in pages:
+        path = output_dir / f"{base}_page_{page:03d}.{fmt}"
+        path.write_bytes(b'x' * page)
+        saved[page] = str(path)
+    return saved
+
+
+def test_verify_merges_complete_shards(tmp_path):
+    write_manifest(tmp_path, 'doc', 5, write_pages(tmp_path, [1, 2]), 1, 2)
+    write_manifest(tmp_path, 'doc', 5, write_pages(tmp_path, [3, 4, 5]), 2, 2)
+
+    assert verify_output(tmp_path, 'doc', 5, 'png') == []
+    merged = json.loads((tmp_path / 'doc.manifest.json').read_text())
+    assert sorted(merged['pages'], key=int) == ['1', '2', '3', '4', '5']
+    assert not list(tmp_path.glob('doc.shard-*'))
+
+
+def test_verify_reports_missing_shard(tmp_path):
+    write_manifest(tmp_path, 'doc', 5, write_pages(tmp_path, [1, 2]), 1, 2)
+
+    problems = verify_output(tmp_path, 'doc', 5, 'png')
+    assert problems == ['page 3: missing', 'page 4: missing', 'page 5: missing']
+    # Shard manifests are kept until the output is complete
+    assert (tmp_path / 'doc.shard-1-of-2.json').exists()
+    assert not (tmp_path / 'doc.manifest.json').exists()
+
+
+def test_verify_reports_duplicate_pages(tmp_path):
+    write_manifest(tmp_path, 'doc', 3, write_pages(tmp_path, [1, 2]), 1, 2)
+    write_manifest(tmp_path, 'doc', 3, write_pages(tmp_path, [2, 3]), 2, 2)
+
+    assert verify_output(tmp_path, 'doc', 3, 'png') == ['page 2: produced 2 times']
+
+
+def test_verify_reports_changed_and_deleted_files(tmp_path):
+    write_manifest(tmp_path, 'doc', 3, write_pages(tmp_path, [1, 2, 3]), 1, 1)
+    (tmp_path / 'doc_page_002.png').write_bytes(b'')
+    (tmp_path / 'doc_page_003.png').unlink()
+
+    assert verify_output(tmp_path, 'doc', 3, 'png') == [
+        'page 2: doc_page_002.png is 0 bytes, expected 2',
+        'page 3: doc_page_003.png does not exist',
+    ]
+
+
+def test_verify_reports_page_count_mismatch(tmp_path):
+    write_manifest(tmp_path, 'doc', 4, write_pages(tmp_path, [1, 2, 3]), 1, 1)
+
+    assert verify_output(tmp_path, 'doc', 3, 'png') == ['doc.shard-1-of-1.json: page count 4, expected 3']
+
+
+def test_verify_counts_empty_shards(tmp_path):
+    write_manifest(tmp_path, 'doc', 1, write_pages(tmp_path, [1]), 1, 2)
+    write_manifest(tmp_path, 'doc', 1, {}, 2, 2)
+
+    assert verify_output(tmp_path, 'doc', 1, 'png') == []
+
+
+def test_verify_without_manifests_checks_page_files(tmp_path):
+    write_pages(tmp_path, [1, 3])
+
+    assert verify_output(tmp_path, 'doc', 3, 'png') == ['page 2: missing']
+    write_pages(tmp_path, [2])
+    assert verify_output(tmp_path, 'doc', 3, 'png') == []
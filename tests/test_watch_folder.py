@@ -0,0 +1,137 @@
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from PIL import Image
+from watch_folder import WatchFolderDaemon
+
+
+class FakePool:
+    """Records submissions; the test decides how each one finishes."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, path, *args):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        future.path = path
+        self.futures.append(future)
+        return future
+
+    def running(self):
+        return [f for f in self.futures if not f.done()]
+
+
+def make_daemon(tmp_path, names, workers=2):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    for name in names:
+        (inbox / name).write_bytes(b'%PDF-1.4')
+    return WatchFolderDaemon(
+        [inbox], tmp_path / 'out', tmp_path / 'done', tmp_path / 'failed',
+        workers=workers, settle_time=0
+    )
+
+
+def settle(daemon, pool):
+    # The first scan only records signatures; entries are ready on the next one
+    daemon.dispatch(pool)
+    return daemon.dispatch(pool)
+
+
+def finish(daemon, future, result=None, error=None):
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result or (True, "1 pages", 0.1))
+    return daemon.collect()
+
+
+def names(futures):
+    return sorted(Path(f.path).name for f in futures)
+
+
+def test_dispatches_one_entry_per_worker(tmp_path):
+    daemon = make_daemon(tmp_path, [f"doc{i}.pdf" for i in range(10)])
+    pool = FakePool()
+    assert settle(daemon, pool)
+    assert len(pool.futures) == 2
+    stats = daemon.stats()
+    assert (stats['running'], stats['queue_depth'], stats['waiting_to_settle']) == (2, 8, 0)
+
+    assert not finish(daemon, pool.futures[0])
+    daemon.dispatch(pool)
+    assert len(pool.running()) == 2
+    assert daemon.stats()['queue_depth'] == 7
+    assert [p.name for p in (tmp_path / 'done').iterdir()] == names(pool.futures[:1])
+
+
+def test_dead_worker_retries_running_entries_alone(tmp_path):
+    daemon = make_daemon(tmp_path, [f"doc{i}.pdf" for i in range(5)])
+    pool = FakePool()
+    settle(daemon, pool)
+    first, second = pool.futures
+    first.set_exception(BrokenProcessPool())
+    assert finish(daemon, second, error=BrokenProcessPool())
+    # Only the entries that were running are suspects, and both stay in the inbox
+    assert {path.name for path in daemon._suspects} == set(names([first, second]))
+    assert not (tmp_path / 'failed').exists()
+
+    pool = FakePool()
+    daemon.dispatch(pool)
+    assert len(pool.futures) == 1
+    # Nothing new is dispatched while a suspect runs alone
+    daemon.dispatch(pool)
+    assert len(pool.futures) == 1
+    assert not finish(daemon, pool.futures[0])
+
+    daemon.dispatch(pool)
+    assert len(pool.futures) == 2
+    assert finish(daemon, pool.futures[1], error=BrokenProcessPool())
+    assert names(pool.futures) == names([first, second])
+    assert [p.name for p in (tmp_path / 'failed').iterdir()] == names(pool.futures[1:])
+
+    # With the suspects resolved, new entries fill the workers again
+    pool = FakePool()
+    daemon.dispatch(pool)
+    assert len(pool.futures) == 2
+    assert not set(names(pool.futures)) & set(names([first, second]))
+
+
+def test_suspects_are_not_starved_by_new_entries(tmp_path):
+    daemon = make_daemon(tmp_path, ['doc0.pdf', 'doc1.pdf'], workers=1)
+    pool = FakePool()
+    settle(daemon, pool)
+    suspect = names(pool.futures)
+    assert finish(daemon, pool.futures[0], error=BrokenProcessPool())
+
+    for i in range(2, 6):
+        (tmp_path / 'inbox' / f"doc{i}.pdf").write_bytes(b'%PDF-1.4')
+    pool = FakePool()
+    settle(daemon, pool)
+    assert names(pool.futures) == suspect
+
+
+def test_run_converts_images(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    for name in ('a.png', 'b.png'):
+        Image.new('RGB', (40, 30), 'red').save(inbox / name)
+    daemon = WatchFolderDaemon(
+        [inbox], tmp_path / 'out', tmp_path / 'done', tmp_path / 'failed',
+        workers=2, poll_interval=0.05, settle_time=0
+    )
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 30
+        while daemon.stats()['done'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        daemon.stop()
+        thread.join()
+    assert daemon.stats()['done'] == 2
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == ['a.pdf', 'b.pdf']
+    assert sorted(p.name for p in (tmp_path / 'done').iterdir()) == ['a.png', 'b.png']
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from pdf_to_png import convert_pdf_to_png
+from images_to_pdf import IMAGE_EXTENSIONS, convert_images_to_pdf, find_images
+
+# Files still being written by common copy tools
+PARTIAL_SUFFIXES = ('.part', '.tmp', '.crdownload', '.partial')
+
+def is_ingestible(path):
+    """
+    Check whether a hot-folder entry is something the daemon converts.
+
+    PDFs, single images and directories of images ("bundles") are accepted.
+    Hidden files and partial downloads are ignored.
+
+    Args:
+        path (Path): Entry in an input directory
+
+    Returns:
+        bool: True if the entry should be picked up
+    """
+    name = path.name
+    if name.startswith('.') or name.lower().endswith(PARTIAL_SUFFIXES):
+        return False
+    if path.is_dir():
+        return True
+    suffix = path.suffix.lower()
+    return suffix == '.pdf' or suffix in IMAGE_EXTENSIONS
+
+def entry_signature(path):
+    """
+    Return a cheap fingerprint that changes while an entry is being written.
+
+    Args:
+        path (Path): File or bundle directory
+
+    Returns:
+        tuple: (file count, total size, newest mtime)
+    """
+    if not path.is_dir():
+        st = path.stat()
+        return (1, st.st_size, st.st_mtime_ns)
+
+    count = size = newest = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            st = os.stat(os.path.join(root, name))
+            count += 1
+            size += st.st_size
+            newest = max(newest, st.st_mtime_ns)
+    return (count, size, newest)
+
+def process_entry(path, output_dir, dpi=200, fmt='png'):
+    """
+    Convert one hot-folder entry. Runs in a worker process.
+
+    PDFs are rendered to images in output_dir/<name>/, images and image
+    bundles are combined into output_dir/<name>.pdf.
+
+    Args:
+        path (str): PDF, image or bundle directory
+        output_dir (str): Root directory for converted output
+        dpi (int, optional): DPI used for PDF pages. Defaults to 200.
+        fmt (str, optional): Image format used for PDF pages. Defaults to 'png'.
+
+    Returns:
+        tuple: (success, message, seconds spent converting)
+    """
+    started = time.monotonic()
+    path = Path(path)
+    output_dir = Path(output_dir)
+
+    try:
+        if path.is_dir():
+            images = find_images(path)
+            if not images:
+                return False, "bundle contains no images", time.monotonic() - started
+            pages = convert_images_to_pdf(images, output_dir / f"{path.name}.pdf")
+            message = f"{pages} pages"
+        elif path.suffix.lower() == '.pdf':
+            saved = convert_pdf_to_png(path, output_dir / path.stem, dpi=dpi, fmt=fmt)
+            if not saved:
+                return False, "no pages converted", time.monotonic() - started
+            message = f"{len(saved)} pages"
+        else:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            pages = convert_images_to_pdf([str(path)], output_dir / f"{path.stem}.pdf")
+            message = f"{pages} pages"
+    except Exception as e:
+        return False, str(e), time.monotonic() - started
+
+    return True, message, time.monotonic() - started
+
+def move_to(path, target_dir):
+    """Move an entry into target_dir without overwriting an earlier entry of the same name."""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / path.name
+    counter = 1
+    while target.exists():
+        target = target_dir / f"{path.stem}.{counter}{path.suffix}"
+        counter += 1
+    shutil.move(str(path), str(target))
+    return target
+
+class WatchFolderDaemon:
+    """
+    Watch input directories and convert entries once they are fully written.
+
+    An entry is considered complete when its size and modification time have
+    not changed for settle_time seconds. Completed entries are dispatched to a
+    process pool, at most one per worker, and afterwards moved to done_dir or
+    failed_dir. Settled entries beyond that wait in the inbox.
+
+    If a worker process dies (e.g. killed for running out of memory), the pool
+    is replaced and the entries that were running stay in the inbox. They are
+    retried one at a time before anything new is dispatched, so only the
+    entry that kills a worker on its own is moved to failed_dir.
+    """
+
+    def __init__(self, input_dirs, output_dir, done_dir, failed_dir, workers=2,
+                 poll_interval=2.0, settle_time=5.0, dpi=200, fmt='png', status_file=None):
+        self.input_dirs = [Path(d) for d in input_dirs]
+        self.output_dir = Path(output_dir)
+        self.done_dir = Path(done_dir)
+        self.failed_dir = Path(failed_dir)
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.dpi = dpi
+        self.fmt = fmt
+        self.status_file = Path(status_file) if status_file else None
+
+        # path -> (signature, time the signature was first seen)
+        self._pending = {}
+        # future -> (path, time it was queued, whether it runs alone)
+        self._in_flight = {}
+        # Entries that were running when a worker died, retried alone
+        self._suspects = set()
+        # Settled entries waiting for a free worker
+        self._queued = 0
+        self._latencies = deque(maxlen=200)
+        self._done = 0
+        self._failed = 0
+        self._started = time.monotonic()
+        self._stopping = False
+
+    def scan(self):
+        """Return entries whose contents have settled and are not yet being converted."""
+        now = time.monotonic()
+        busy = {path for path, _, _ in self._in_flight.values()}
+        seen = set()
+        ready = []
+
+        for input_dir in self.input_dirs:
+            try:
+                entries = list(input_dir.iterdir())
+            except FileNotFoundError:
+                continue
+
+            for path in entries:
+                if path in busy or not is_ingestible(path):
+                    continue
+                try:
+                    signature = entry_signature(path)
+                except OSError:
+                    # Removed or renamed while scanning
+                    continue
+                seen.add(path)
+
+                previous = self._pending.get(path)
+                if previous is None or previous[0] != signature:
+                    self._pending[path] = (signature, now)
+                elif now - previous[1] >= self.settle_time:
+                    ready.append(path)
+
+        # Forget entries that disappeared before they settled
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+                self._suspects.discard(path)
+
+        return sorted(ready, key=lambda p: self._pending[p][1])
+
+    def collect(self):
+        """
+        Move finished entries to done/failed and record their latency.
+
+        Returns:
+            bool: True if a worker died and the pool has to be replaced
+        """
+        broken = False
+        for future in [f for f in self._in_flight if f.done()]:
+            path, queued_at, alone = self._in_flight.pop(future)
+            try:
+                ok, message, seconds = future.result()
+            except BrokenProcessPool:
+                broken = True
+                if not alone:
+                    # Any of the running entries may have killed the worker
+                    self.requeue(path)
+                    continue
+                ok, message, seconds = False, "worker process died", 0.0
+            except Exception as e:
+                ok, message, seconds = False, str(e), 0.0
+            self._suspects.discard(path)
+
+            latency = time.monotonic() - queued_at
+            self._latencies.append(latency)
+            try:
+                move_to(path, self.done_dir if ok else self.failed_dir)
+            except OSError as e:
+                print(f"Could not move {path}: {e}")
+
+            if ok:
+                self._done += 1
+                print(f"Done: {path.name} ({message}, {seconds:.1f}s convert, {latency:.1f}s total)")
+            else:
+                self._failed += 1
+                print(f"Failed: {path.name}: {message}")
+        return broken
+
+    def requeue(self, path):
+        """Leave an entry in the inbox and retry it alone as soon as the pool is idle."""
+        self._suspects.add(path)
+        print(f"Requeued: {path.name} (worker process died)")
+        try:
+            # Already settled, so it is ready on the next scan
+            self._pending[path] = (entry_signature(path), time.monotonic() - self.settle_time)
+        except OSError:
+            self._suspects.discard(path)
+
+    def dispatch(self, pool):
+        """
+        Submit settled entries to the pool, one per free worker.
+
+        Returns:
+            bool: False if the pool turned out to be broken
+        """
+        ready = self.scan()
+        suspects = [path for path in ready if path in self._suspects]
+        if suspects or any(alone for _, _, alone in self._in_flight.values()):
+            # Suspects run alone and before anything new, once the pool is idle
+            alone = True
+            batch = [] if self._in_flight else suspects[:1]
+        else:
+            alone = False
+            batch = ready[:self.workers - len(self._in_flight)]
+
+        self._queued = len(ready)
+        for path in batch:
+            try:
+                future = pool.submit(process_entry, str(path), str(self.output_dir), self.dpi, self.fmt)
+            except BrokenProcessPool:
+                return False
+            self._in_flight[future] = (path, time.monotonic(), alone)
+            del self._pending[path]
+            self._queued -= 1
+        return True
+
+    def stats(self):
+        """
+        Return current throughput figures.
+
+        Returns:
+            dict: queue depth (settled entries waiting for a worker), running
+            jobs, completed/failed counts and average/p95 per-file latency
+            over the last 200 entries
+        """
+        latencies = sorted(self._latencies)
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return {
+            'queue_depth': self._queued,
+            'running': len(self._in_flight),
+            'waiting_to_settle': len(self._pending) - self._queued,
+            'done': self._done,
+            'failed': self._failed,
+            'files_per_minute': (self._done + self._failed) * 60.0 / elapsed,
+            'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_p95': latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        }
+
+    def report(self):
+        stats = self.stats()
+        if self.status_file:
+            tmp = self.status_file.with_suffix(self.status_file.suffix + '.tmp')
+            tmp.write_text(json.dumps(stats, indent=2))
+            os.replace(tmp, self.status_file)
+        return stats
+
+    def stop(self, *args):
+        self._stopping = True
+
+    def run(self):
+        """Poll the input directories until stop() is called or the process is interrupted."""
+        for d in (self.output_dir, self.done_dir, self.failed_dir, *self.input_dirs):
+            d.mkdir(parents=True, exist_ok=True)
+
+        print(f"Watching {', '.join(str(d) for d in self.input_dirs)} with {self.workers} workers")
+        last_report = ''
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while not self._stopping:
+                if self.collect() or not self.dispatch(pool):
+                    print("A worker process died, restarting the pool")
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=self.workers)
+                    # Pick up whatever the broken pool left behind before dispatching again
+                    continue
+
+                stats = self.report()
+                line = (f"Queue: {stats['queue_depth']} waiting, {stats['running']} running, "
+                        f"{stats['done']} done, {stats['failed']} failed, "
+                        f"latency avg {stats['latency_avg']:.1f}s p95 {stats['latency_p95']:.1f}s")
+                if line != last_report:
+                    print(line)
+                    last_report = line
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+
+        print("Stopping, waiting for running conversions...")
+        pool.shutdown(wait=True)
+        self.collect()
+        self.report()
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description='Watch folders and convert PDFs and images as they arrive.')
+    parser.add_argument('input_dirs', nargs='+', help='Directories to watch')
+    parser.add_argument('-o', '--output', required=True, help='Directory for converted output')
+    parser.add_argument('--done', help='Directory for successfully converted inputs (default: <output>/done)')
+    parser.add_argument('--failed', help='Directory for inputs that failed (default: <output>/failed)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between directory scans (default: 2)')
+    parser.add_argument('--settle-time', type=float, default=5.0,
+                        help='Seconds an input must stay unchanged before it is picked up (default: 5)')
+    parser.add_argument('--dpi', type=int, default=200, help='DPI for PDF pages (default: 200)')
+    parser.add_argument('--format', default='png', choices=['png', 'jpeg', 'jpg', 'tiff'],
+                        help='Image format for PDF pages (default: png)')
+    parser.add_argument('--status-file', help='Write queue depth and latency statistics to this JSON file')
+
+    args = parser.parse_args()
+    output = Path(args.output)
+
+    daemon = WatchFolderDaemon(
+        input_dirs=args.input_dirs,
+        output_dir=output,
+        done_dir=args.done or output / 'done',
+        failed_dir=args.failed or output / 'failed',
+        workers=args.workers,
+        poll_interval=args.poll_interval,
+        settle_time=args.settle_time,
+        dpi=args.dpi,
+        fmt=args.format.lower(),
+        status_file=args.status_file
+    )
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())